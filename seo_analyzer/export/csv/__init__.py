@@ -1,8 +1,9 @@
 """CSV модули для экспорта данных"""
 
 from .filtered_saver import save_filtered_queries
+from .uring_writer import is_uring_enabled, write_chunks
 
-__all__ = ['save_filtered_queries']
+__all__ = ['save_filtered_queries', 'is_uring_enabled', 'write_chunks']
 
 
 
@@ -0,0 +1,143 @@
+"""Запись больших файлов экспорта через io_uring (опционально, только Linux)
+
+Включается переменной окружения SEO_URING=1 при установленном пакете liburing.
+Во всех остальных случаях (и при любой ошибке io_uring) данные пишутся
+обычным буферизованным файлом.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+try:
+    from liburing import (
+        Ring,
+        Cqe,
+        io_uring_queue_init,
+        io_uring_queue_exit,
+        io_uring_get_sqe,
+        io_uring_prep_write,
+        io_uring_sqe_set_data64,
+        io_uring_submit,
+        io_uring_wait_cqe,
+        io_uring_cq_advance,
+        trap_error,
+    )
+    LIBURING_AVAILABLE = True
+except ImportError:
+    LIBURING_AVAILABLE = False
+
+
+# Размер одного блока записи (1 МБ)
+URING_CHUNK_SIZE = 1 << 20
+
+# Глубина очереди io_uring (сколько блоков отправляется одним submit)
+URING_QUEUE_DEPTH = 64
+
+
+def is_uring_enabled() -> bool:
+    """
+    Проверить, включена ли запись через io_uring
+
+    Returns:
+        True если Linux, SEO_URING=1 и установлен liburing
+    """
+    return (
+        sys.platform == 'linux'
+        and os.environ.get('SEO_URING') == '1'
+        and LIBURING_AVAILABLE
+    )
+
+
+def split_chunks(data: bytes, chunk_size: int = URING_CHUNK_SIZE) -> List[memoryview]:
+    """
+    Разбить данные на блоки без копирования
+
+    Args:
+        data: Данные для записи
+        chunk_size: Размер блока
+
+    Returns:
+        Список memoryview блоков
+    """
+    view = memoryview(data)
+    return [view[start:start + chunk_size] for start in range(0, len(view), chunk_size)]
+
+
+def _uring_write(fd: int, chunks: List[memoryview]):
+    """
+    Записать блоки в файл пачками SQE через io_uring
+
+    Args:
+        fd: Дескриптор открытого на запись файла
+        chunks: Блоки данных (пишутся подряд с нулевого смещения)
+    """
+    ring = Ring()
+    cqe = Cqe()
+    io_uring_queue_init(URING_QUEUE_DEPTH, ring)
+
+    try:
+        offset = 0
+        for batch_start in range(0, len(chunks), URING_QUEUE_DEPTH):
+            # Буферы пачки живут до получения всех CQE
+            buffers = [bytes(chunk) for chunk in chunks[batch_start:batch_start + URING_QUEUE_DEPTH]]
+            offsets = []
+            for index, buffer in enumerate(buffers):
+                sqe = io_uring_get_sqe(ring)
+                io_uring_prep_write(sqe, fd, buffer, offset)
+                # CQE приходят в произвольном порядке - буфер находим по user_data
+                io_uring_sqe_set_data64(sqe, index)
+                offsets.append(offset)
+                offset += len(buffer)
+
+            io_uring_submit(ring)
+
+            pending = len(buffers)
+            while pending:
+                trap_error(io_uring_wait_cqe(ring, cqe))
+                index = cqe[0].user_data
+                written = trap_error(cqe[0].res)
+                io_uring_cq_advance(ring, 1)
+
+                if written == 0:
+                    raise OSError(f"io_uring: запись не продвигается (смещение {offsets[index]})")
+
+                if written < len(buffers[index]):
+                    # Короткая запись - дописываем остаток с того места, где остановились
+                    buffers[index] = buffers[index][written:]
+                    offsets[index] += written
+                    sqe = io_uring_get_sqe(ring)
+                    io_uring_prep_write(sqe, fd, buffers[index], offsets[index])
+                    io_uring_sqe_set_data64(sqe, index)
+                    io_uring_submit(ring)
+                    continue
+
+                pending -= 1
+    finally:
+        io_uring_queue_exit(ring)
+
+
+def write_chunks(output_path: Path, data: bytes):
+    """
+    Записать данные в файл (через io_uring если включен, иначе обычной записью)
+
+    Args:
+        output_path: Путь к файлу
+        data: Полностью сериализованное содержимое файла
+    """
+    chunks = split_chunks(data)
+
+    if is_uring_enabled():
+        fd = os.open(str(output_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            _uring_write(fd, chunks)
+            return
+        except Exception as e:
+            print(f"⚠️ io_uring недоступен ({e}), используем обычную запись")
+        finally:
+            os.close(fd)
+
+    with open(output_path, 'wb', buffering=URING_CHUNK_SIZE) as output_file:
+        for chunk in chunks:
+            output_file.write(chunk)
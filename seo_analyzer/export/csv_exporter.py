@@ -4,6 +4,23 @@ from pathlib import Path
 from typing import Dict, Optional
 import pandas as pd
 
+from .csv.uring_writer import is_uring_enabled, write_chunks
+
+
+# Размер буфера файла при записи CSV (1 МБ)
+CSV_BUFFER_SIZE = 1 << 20
+
+# Строковые колонки с малым числом уникальных значений - храним как category
+CATEGORICAL_COLUMNS = (
+    'semantic_cluster_id',
+    'main_intent',
+    'funnel_stage',
+    'target_page_type',
+    'geo_country',
+    'geo_type',
+    'detected_brand',
+)
+
 
 class CSVExporter:
     """Экспортер результатов в CSV"""
@@ -40,11 +57,15 @@ class CSVExporter:
             # Определяем колонки для экспорта
             columns_to_export = self._get_export_columns(df, include_forms)
             
-            # Фильтруем только существующие колонки
-            available_columns = [col for col in columns_to_export if col in df.columns]
+            # Фильтруем только существующие колонки (проверка по множеству - O(1))
+            df_columns = set(df.columns)
+            available_columns = [col for col in columns_to_export if col in df_columns]
             
             export_df = df[available_columns].copy()
             
+            # Повторяющиеся строки -> category (меньше памяти, быстрее сериализация)
+            self._categorize_columns(export_df)
+            
             # Конвертируем списки в строки для CSV
             if 'serp_urls' in export_df.columns:
                 export_df['serp_urls'] = export_df['serp_urls'].apply(
@@ -56,14 +77,20 @@ class CSVExporter:
                 )
             
             # Сохраняем с кавычками для всех полей
-            export_df.to_csv(
-                output_path, 
-                index=False, 
-                encoding=self.encoding,
-                sep=';',  # Используем точку с запятой как разделитель
-                quoting=1,  # QUOTE_ALL - все поля в кавычках
-                quotechar='"'  # Двойные кавычки
-            )
+            csv_options = {
+                'index': False,
+                'sep': ';',  # Используем точку с запятой как разделитель
+                'quoting': 1,  # QUOTE_ALL - все поля в кавычках
+                'quotechar': '"',  # Двойные кавычки
+            }
+            
+            if is_uring_enabled():
+                # Опционально (SEO_URING=1): сериализуем в память и пишем блоками через io_uring
+                write_chunks(output_path, export_df.to_csv(**csv_options).encode(self.encoding))
+            else:
+                # Файл открываем сами с большим буфером - меньше системных вызовов write()
+                with open(output_path, 'wb', buffering=CSV_BUFFER_SIZE) as output_file:
+                    export_df.to_csv(output_file, encoding=self.encoding, **csv_options)
             
             print(f"✓ Экспортировано {len(export_df)} запросов в {output_path}")
             return True
@@ -72,6 +99,17 @@ class CSVExporter:
             print(f"⚠️ Ошибка экспорта CSV: {e}")
             return False
     
+    def _categorize_columns(self, df: pd.DataFrame) -> None:
+        """
+        Приводит повторяющиеся строковые колонки к типу category (in-place)
+        
+        Args:
+            df: DataFrame (копия, принадлежащая экспортеру)
+        """
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns and pd.api.types.is_string_dtype(df[col].dtype):
+                df[col] = df[col].astype('category')
+    
     def _get_export_columns(self, df: pd.DataFrame, include_forms: bool = True) -> list:
         """
         Возвращает список колонок для экспорта
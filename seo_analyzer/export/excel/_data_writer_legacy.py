@@ -0,0 +1,158 @@
+"""Запись данных в Excel листы (сводка кластеров, топ приоритетных, LSI)"""
+
+import pandas as pd
+
+from .utils.column_spec import build_column_spec, write_column_specs
+from .utils.row_writer import write_dataframe_rows
+
+
+def _write_sheet(
+    writer: pd.ExcelWriter,
+    sheet_name: str,
+    df_export: pd.DataFrame,
+    formats: dict,
+    with_autofilter: bool = True
+):
+    """
+    Записать DataFrame на новый лист построчно (книга открыта в режиме constant_memory)
+    
+    Args:
+        writer: ExcelWriter объект
+        sheet_name: Название листа
+        df_export: DataFrame для записи на лист
+        formats: Словарь с форматами
+        with_autofilter: Добавить автофильтр на заголовки
+    """
+    worksheet = writer.book.add_worksheet(sheet_name)
+    
+    # Заголовки (с переводом на русский), ширина и форматы чисел - до данных:
+    # в режиме constant_memory строки пишутся по порядку, DataFrame.to_excel теряет ячейки
+    write_column_specs(worksheet, build_column_spec(df_export), formats, len(df_export))
+    
+    # Записываем данные построчно
+    write_dataframe_rows(worksheet, df_export, start_row=1)
+    
+    worksheet.freeze_panes(1, 0)
+    
+    if with_autofilter:
+        worksheet.autofilter(0, 0, len(df_export), len(df_export.columns) - 1)
+
+
+def create_top_priority_sheet(df: pd.DataFrame, writer: pd.ExcelWriter, formats: dict):
+    """
+    Создать лист с топ приоритетными запросами
+    
+    Args:
+        df: DataFrame с данными
+        writer: ExcelWriter объект
+        formats: Словарь с форматами
+    """
+    sheet_name = 'Топ приоритетных'
+    
+    # Берем топ 100
+    df_top = df.nlargest(100, 'priority_score')
+    
+    # Основные колонки для топ-запросов
+    columns = [
+        'keyword', 'frequency_world', 'priority_score',
+        'kei_effectiveness', 'main_intent'
+    ]
+    
+    # Фильтруем только существующие колонки
+    columns = [col for col in columns if col in df_top.columns]
+    df_export = df_top[columns]
+    
+    _write_sheet(writer, sheet_name, df_export, formats)
+
+
+def create_clusters_summary_sheet(df: pd.DataFrame, writer: pd.ExcelWriter, formats: dict):
+    """
+    Создать сводку по кластерам
+    
+    Args:
+        df: DataFrame с данными
+        writer: ExcelWriter объект
+        formats: Словарь с форматами
+    """
+    sheet_name = 'Сводка по кластерам'
+    
+    # Проверяем наличие колонки semantic_cluster_id
+    if 'semantic_cluster_id' not in df.columns:
+        print("ℹ️  Пропускаем лист 'Сводка по кластерам' - нет кластеризации")
+        return
+    
+    # Агрегация по кластерам
+    cluster_summary = df.groupby('semantic_cluster_id').agg({
+        'keyword': 'count',
+        'frequency_world': 'sum',
+        'main_intent': lambda x: x.mode()[0] if len(x) > 0 else 'unknown',
+    }).reset_index()
+    
+    cluster_summary.columns = [
+        'ID кластера',
+        'Количество запросов',
+        'Общая частота',
+        'Основной интент'
+    ]
+    
+    # Добавляем названия кластеров (главный запрос)
+    main_queries = df.loc[df.groupby('semantic_cluster_id')['frequency_world'].idxmax()]
+    cluster_summary['Главный запрос'] = cluster_summary['ID кластера'].map(
+        main_queries.set_index('semantic_cluster_id')['keyword']
+    )
+    
+    # Сортируем по частоте
+    cluster_summary = cluster_summary.sort_values('Общая частота', ascending=False)
+    
+    _write_sheet(writer, sheet_name, cluster_summary, formats)
+
+
+def create_lsi_sheet(df: pd.DataFrame, writer: pd.ExcelWriter, formats: dict):
+    """
+    Создать лист с LSI фразами
+    
+    Args:
+        df: DataFrame с данными
+        writer: ExcelWriter объект
+        formats: Словарь с форматами
+    """
+    sheet_name = 'LSI фразы'
+    
+    # Если есть полная информация о LSI
+    if 'cluster_lsi_full' in df.columns:
+        lsi_rows = []
+        
+        for _, row in df.iterrows():
+            cluster_id = row.get('semantic_cluster_id', -1)
+            lsi_list = row.get('cluster_lsi_full', [])
+            
+            if isinstance(lsi_list, list):
+                for lsi_item in lsi_list[:30]:  # Топ 30 на кластер
+                    if isinstance(lsi_item, dict):
+                        lsi_rows.append({
+                            'ID кластера': cluster_id,
+                            'LSI фраза': lsi_item.get('phrase', ''),
+                            'Частота': lsi_item.get('frequency', 0),
+                            'Количество запросов': lsi_item.get('queries_count', 0),
+                            'Основной источник': lsi_item.get('main_source', '')
+                        })
+        
+        if lsi_rows:
+            lsi_df = pd.DataFrame(lsi_rows)
+            lsi_df = lsi_df.drop_duplicates(subset=['ID кластера', 'LSI фраза'])
+            lsi_df = lsi_df.sort_values(['ID кластера', 'Частота'], ascending=[True, False])
+            
+            _write_sheet(writer, sheet_name, lsi_df, formats)
+    else:
+        # Простой вариант - просто текст (используем строковую версию)
+        col_to_use = 'cluster_lsi_phrases_str' if 'cluster_lsi_phrases_str' in df.columns else 'cluster_lsi_phrases'
+        lsi_simple = df[['semantic_cluster_id', col_to_use]].drop_duplicates()
+        lsi_simple.columns = ['ID кластера', 'LSI фразы']
+        
+        # Конвертируем список словарей в строку если нужно
+        if col_to_use == 'cluster_lsi_phrases':
+            lsi_simple['LSI фразы'] = lsi_simple['LSI фразы'].apply(
+                lambda x: ', '.join([item.get('phrase', '') for item in x]) if isinstance(x, list) and x else str(x) if x else ''
+            )
+        
+        _write_sheet(writer, sheet_name, lsi_simple, formats, with_autofilter=False)
@@ -2,6 +2,7 @@
 
 import pandas as pd
 from .faq_data import get_faq_data
+from .utils.row_writer import write_dataframe_rows
 
 
 def create_faq_sheet(writer: pd.ExcelWriter, formats: dict):
@@ -17,10 +18,11 @@ def create_faq_sheet(writer: pd.ExcelWriter, formats: dict):
     faq_data = get_faq_data()
     faq_df = pd.DataFrame(faq_data)
     
-    # Записываем данные
-    faq_df.to_excel(writer, sheet_name=sheet_name, index=False)
+    worksheet = writer.book.add_worksheet(sheet_name)
     
-    worksheet = writer.sheets[sheet_name]
+    # Заголовки с форматированием, затем данные построчно (совместимо с constant_memory)
+    worksheet.write_row(0, 0, list(faq_df.columns), formats['header'])
+    write_dataframe_rows(worksheet, faq_df, start_row=1)
     
     # Заморозить первую строку
     worksheet.freeze_panes(1, 0)
@@ -33,8 +35,4 @@ def create_faq_sheet(writer: pd.ExcelWriter, formats: dict):
     worksheet.set_column(1, 1, 30)  # Столбец
     worksheet.set_column(2, 2, 80)  # Описание
     
-    # Форматирование заголовков
-    for col_num in range(len(faq_df.columns)):
-        worksheet.write(0, col_num, faq_df.columns[col_num], formats['header'])
-    
     print(f"  ✓ Создана страница FAQ с {len(faq_df)} описаниями")
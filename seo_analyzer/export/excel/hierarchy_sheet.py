@@ -3,6 +3,17 @@
 import pandas as pd
 from typing import Optional
 
+from .utils.row_writer import write_dataframe_rows
+
+
+# Текст пустого листа иерархии
+PLACEHOLDER_MESSAGES = (
+    'Иерархия не сгенерирована. Для построения иерархии требуется:',
+    '1. SERP данные с URL',
+    '2. API ключ DeepSeek',
+    '3. Запуск анализа иерархии через pipeline',
+)
+
 
 def create_hierarchy_sheet(
     writer: pd.ExcelWriter,
@@ -20,36 +31,24 @@ def create_hierarchy_sheet(
     sheet_name = 'Иерархия проекта'
     
     if hierarchy_df is None or hierarchy_df.empty:
-        # Создаем пустой лист с пояснением
-        placeholder_df = pd.DataFrame([{
-            'Информация': 'Иерархия не сгенерирована. Для построения иерархии требуется:',
-        }, {
-            'Информация': '1. SERP данные с URL',
-        }, {
-            'Информация': '2. API ключ DeepSeek',
-        }, {
-            'Информация': '3. Запуск анализа иерархии через pipeline'
-        }])
-        
-        placeholder_df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        worksheet = writer.sheets[sheet_name]
+        # Создаем пустой лист с пояснением (пишем ячейки напрямую, без DataFrame)
+        worksheet = writer.book.add_worksheet(sheet_name)
         worksheet.set_column(0, 0, 80)
         
         # Форматируем заголовок
-        worksheet.write(0, 0, 'Информация', formats['header'])
+        worksheet.write_string(0, 0, 'Информация', formats['header'])
+        
+        for row_num, message in enumerate(PLACEHOLDER_MESSAGES, start=1):
+            worksheet.write_string(row_num, 0, message, formats['cell'])
         
         print(f"  ℹ️  Создан лист '{sheet_name}' (пустой)")
         return
     
-    # Записываем данные
-    hierarchy_df.to_excel(writer, sheet_name=sheet_name, index=False, startrow=1, header=False)
-    
-    worksheet = writer.sheets[sheet_name]
+    worksheet = writer.book.add_worksheet(sheet_name)
     
-    # Записываем заголовки
-    for col_num, col_name in enumerate(hierarchy_df.columns):
-        worksheet.write(0, col_num, col_name, formats['header'])
+    # Записываем заголовки, затем данные построчно (совместимо с constant_memory)
+    worksheet.write_row(0, 0, list(hierarchy_df.columns), formats['header'])
+    write_dataframe_rows(worksheet, hierarchy_df, start_row=1)
     
     # Настройки листа
     worksheet.freeze_panes(1, 0)
@@ -76,28 +75,19 @@ def create_hierarchy_sheet(
     if 'Уровень' in hierarchy_df.columns:
         level_col = hierarchy_df.columns.get_loc('Уровень')
         
-        # Уровень 1 - синий фон
-        worksheet.conditional_format(1, level_col, len(hierarchy_df), level_col, {
-            'type': 'cell',
-            'criteria': '==',
-            'value': 1,
-            'format': writer.book.add_format({'bg_color': '#D6EAF8'})
-        })
-        
-        # Уровень 2 - светло-синий
-        worksheet.conditional_format(1, level_col, len(hierarchy_df), level_col, {
-            'type': 'cell',
-            'criteria': '==',
-            'value': 2,
-            'format': writer.book.add_format({'bg_color': '#EBF5FB'})
-        })
-        
-        # Уровень 3 - очень светлый
+        # Одно правило на всю колонку: уровень 1 - синий фон,
+        # 2 - светло-синий, 3 - очень светлый
         worksheet.conditional_format(1, level_col, len(hierarchy_df), level_col, {
-            'type': 'cell',
-            'criteria': '==',
-            'value': 3,
-            'format': writer.book.add_format({'bg_color': '#F8F9F9'})
+            'type': '3_color_scale',
+            'min_type': 'num',
+            'min_value': 1,
+            'min_color': '#D6EAF8',
+            'mid_type': 'num',
+            'mid_value': 2,
+            'mid_color': '#EBF5FB',
+            'max_type': 'num',
+            'max_value': 3,
+            'max_color': '#F8F9F9'
         })
     
     print(f"  ✓ Создан лист '{sheet_name}' с {len(hierarchy_df)} записями")
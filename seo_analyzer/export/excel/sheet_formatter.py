@@ -1,9 +1,51 @@
 """Форматирование листов Excel"""
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 import pandas as pd
 
 
+# Ширина колонок по ключевому слову в названии (первое совпадение)
+COLUMN_WIDTHS = {
+    'query': 40,
+    'cluster_name': 35,
+    'cluster_lsi_phrases': 50,
+    'main_intent': 15,
+    'frequency': 12,
+    'difficulty': 12,
+    'priority': 12,
+    'kei': 12,
+    'serp': 12,
+    'default': 15
+}
+
+# Слова в названии колонки -> формат чисел (ключ словаря форматов)
+INTEGER_FORMAT_WORDS = ('frequency', 'count', 'docs')
+DECIMAL_FORMAT_WORDS = (
+    'score', 'kei', 'difficulty', 'priority', 'effectiveness',
+    'competition', 'ratio', 'coefficient', 'popularity', 'traffic',
+    'cost', 'revenue', 'synergy', 'relevance', 'normalized',
+    'potential', 'value', 'ctr'
+)
+
+# Цветовые шкалы условного форматирования
+HIGH_IS_GOOD_SCALE = {
+    'type': '3_color_scale',
+    'min_color': '#F8696B',
+    'mid_color': '#FFEB84',
+    'max_color': '#63BE7B'
+}
+HIGH_IS_BAD_SCALE = {
+    'type': '3_color_scale',
+    'min_color': '#63BE7B',
+    'mid_color': '#FFEB84',
+    'max_color': '#F8696B'
+}
+FREQUENCY_SCALE = {
+    'type': '2_color_scale',
+    'min_color': '#FFFFFF',
+    'max_color': '#63BE7B'
+}
+
 def create_formats(workbook) -> Dict:
     """
     Создать форматы для ячеек Excel
@@ -82,6 +124,75 @@ def create_formats(workbook) -> Dict:
     return formats
 
 
+def get_column_width(col_name: str) -> int:
+    """
+    Определить ширину колонки по её названию
+    
+    Args:
+        col_name: Название колонки
+        
+    Returns:
+        Ширина колонки
+    """
+    col_lower = str(col_name).lower()
+    
+    for key, value in COLUMN_WIDTHS.items():
+        if key in col_lower:
+            return value
+    
+    return COLUMN_WIDTHS['default']
+
+
+def get_number_format_key(col_name: str) -> Optional[str]:
+    """
+    Определить формат чисел для колонки по её названию
+    
+    Args:
+        col_name: Название колонки
+        
+    Returns:
+        Ключ словаря форматов ('number' / 'decimal') или None
+    """
+    col_lower = str(col_name).lower()
+    
+    # Целые числа (частота, количество)
+    if any(word in col_lower for word in INTEGER_FORMAT_WORDS):
+        return 'number'
+    
+    # Дробные числа с 2 знаками после запятой
+    if any(word in col_lower for word in DECIMAL_FORMAT_WORDS):
+        return 'decimal'
+    
+    return None
+
+
+def get_conditional_format(col_name: str) -> Optional[dict]:
+    """
+    Определить условное форматирование для колонки по её названию
+    
+    Args:
+        col_name: Название колонки
+        
+    Returns:
+        Параметры conditional_format или None
+    """
+    col_lower = str(col_name).lower()
+    
+    # KEI effectiveness - зеленый=высокий, красный=низкий
+    if 'effectiveness' in col_lower or 'priority' in col_lower:
+        return HIGH_IS_GOOD_SCALE
+    
+    # Competition - красный=высокий, зеленый=низкий (инвертировано)
+    if 'competition' in col_lower or 'difficulty' in col_lower:
+        return HIGH_IS_BAD_SCALE
+    
+    # Frequency - зеленый=высокий
+    if 'frequency' in col_lower:
+        return FREQUENCY_SCALE
+    
+    return None
+
+
 def set_column_widths(worksheet, columns: List[str]):
     """
     Установить ширину колонок
@@ -90,30 +201,8 @@ def set_column_widths(worksheet, columns: List[str]):
         worksheet: xlsxwriter worksheet объект
         columns: Список названий колонок
     """
-    widths = {
-        'query': 40,
-        'cluster_name': 35,
-        'cluster_lsi_phrases': 50,
-        'main_intent': 15,
-        'frequency': 12,
-        'difficulty': 12,
-        'priority': 12,
-        'kei': 12,
-        'serp': 12,
-        'default': 15
-    }
-    
     for col_num, col_name in enumerate(columns):
-        col_lower = str(col_name).lower()
-        
-        # Определяем ширину
-        width = widths['default']
-        for key, value in widths.items():
-            if key in col_lower:
-                width = value
-                break
-        
-        worksheet.set_column(col_num, col_num, width)
+        worksheet.set_column(col_num, col_num, get_column_width(col_name))
 
 
 def add_conditional_formatting(
@@ -131,33 +220,9 @@ def add_conditional_formatting(
     """
     # Находим колонки для форматирования
     for col_num, col_name in enumerate(df.columns):
-        col_lower = str(col_name).lower()
-        
-        # KEI effectiveness - зеленый=высокий, красный=низкий
-        if 'effectiveness' in col_lower or 'priority' in col_lower:
-            worksheet.conditional_format(1, col_num, len(df), col_num, {
-                'type': '3_color_scale',
-                'min_color': '#F8696B',
-                'mid_color': '#FFEB84',
-                'max_color': '#63BE7B'
-            })
-        
-        # Competition - красный=высокий, зеленый=низкий (инвертировано)
-        elif 'competition' in col_lower or 'difficulty' in col_lower:
-            worksheet.conditional_format(1, col_num, len(df), col_num, {
-                'type': '3_color_scale',
-                'min_color': '#63BE7B',
-                'mid_color': '#FFEB84',
-                'max_color': '#F8696B'
-            })
-        
-        # Frequency - зеленый=высокий
-        elif 'frequency' in col_lower:
-            worksheet.conditional_format(1, col_num, len(df), col_num, {
-                'type': '2_color_scale',
-                'min_color': '#FFFFFF',
-                'max_color': '#63BE7B'
-            })
+        conditional_format = get_conditional_format(col_name)
+        if conditional_format:
+            worksheet.conditional_format(1, col_num, len(df), col_num, dict(conditional_format))
 
 
 def add_cluster_grouping(
@@ -205,36 +270,13 @@ def apply_number_formats(
         formats: Словарь с форматами
     """
     for col_num, col_name in enumerate(df.columns):
-        col_lower = str(col_name).lower()
-        
-        # Определяем какой формат применить
-        format_to_use = None
-        
-        # Целые числа (частота, количество)
-        if any(word in col_lower for word in ['frequency', 'count', 'docs']):
-            format_to_use = formats['number']
+        # Значения уже записаны - форматируем только числовые колонки целиком
+        if not pd.api.types.is_numeric_dtype(df.dtypes.iloc[col_num]):
+            continue
         
-        # Дробные числа с 2 знаками после запятой
-        elif any(word in col_lower for word in [
-            'score', 'kei', 'difficulty', 'priority', 'effectiveness',
-            'competition', 'ratio', 'coefficient', 'popularity', 'traffic',
-            'cost', 'revenue', 'synergy', 'relevance', 'normalized',
-            'potential', 'value', 'ctr'
-        ]):
-            format_to_use = formats['decimal']
+        format_key = get_number_format_key(col_name)
         
-        # Применяем формат к колонке (со 2-й строки, т.к. 1-я это заголовок)
-        # ВАЖНО: Записываем ВСЕ значения, включая 0, чтобы не потерять данные
-        if format_to_use:
-            for row_num in range(1, len(df) + 1):
-                try:
-                    cell_value = df.iloc[row_num - 1, col_num]
-                    # Записываем все числовые значения, включая 0
-                    if isinstance(cell_value, (int, float)):
-                        worksheet.write(row_num, col_num, cell_value, format_to_use)
-                    elif pd.notna(cell_value):
-                        # Если это не число, но не NaN, записываем как есть
-                        worksheet.write(row_num, col_num, cell_value)
-                except Exception as e:
-                    # Игнорируем ошибки записи отдельных ячеек
-                    pass
+        # Формат колонки применяется ко всем ячейкам без собственного формата
+        # (включая 0), ширину сохраняем такой же как в set_column_widths
+        if format_key:
+            worksheet.set_column(col_num, col_num, get_column_width(col_name), formats[format_key])
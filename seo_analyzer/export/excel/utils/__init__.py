@@ -2,8 +2,23 @@
 Утилиты для экспорта в Excel
 """
 
-from .column_translator import get_column_translation
-from .column_selector import select_columns_for_export
+from .column_translator import get_column_translation, translate_columns
+from .column_selector import select_columns_for_export, has_direct_export_data
+from .column_spec import ColumnSpec, build_column_spec, write_column_specs
+from .frame_sorter import sort_for_export
+from .row_writer import write_dataframe_rows, materialize_rows, write_rows
 
-__all__ = ['get_column_translation', 'select_columns_for_export']
+__all__ = [
+    'get_column_translation',
+    'translate_columns',
+    'select_columns_for_export',
+    'has_direct_export_data',
+    'ColumnSpec',
+    'build_column_spec',
+    'write_column_specs',
+    'sort_for_export',
+    'write_dataframe_rows',
+    'materialize_rows',
+    'write_rows',
+]
 
@@ -2,25 +2,61 @@
 Выбор колонок для экспорта в Excel
 """
 
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple
 import pandas as pd
 
 
-def select_columns_for_export(df: pd.DataFrame) -> List[str]:
+def has_direct_export_data(df: pd.DataFrame) -> bool:
+    """
+    Проверить, нужно ли выводить колонки Yandex Direct
+    
+    Args:
+        df: DataFrame с данными
+        
+    Returns:
+        True если есть данные Direct И частотность (Wordstat)
+    """
+    # Частотность проверяется только если данные Direct есть
+    return bool(
+        'direct_shows' in df.columns and (df['direct_shows'] > 0).any()
+        and 'frequency_exact' in df.columns and (df['frequency_exact'] > 0).any()
+    )
+
+
+def select_columns_for_export(df: pd.DataFrame, include_direct: Optional[bool] = None) -> List[str]:
     """
     Выбрать колонки для экспорта
     
     Args:
         df: DataFrame с данными
+        include_direct: Выводить колонки Direct (None - проверить данные df)
         
     Returns:
         Список названий колонок для экспорта
     """
-    # Проверяем наличие данных Direct
-    has_direct_data = 'direct_shows' in df.columns and (df['direct_shows'] > 0).any()
+    # Direct колонки зависят от данных, поэтому проверяются на каждом вызове
+    # (или передаются готовыми); список колонок для схемы кэшируется
+    if include_direct is None:
+        include_direct = has_direct_export_data(df)
     
-    # Проверяем наличие частотности (Wordstat)
-    has_frequency_data = 'frequency_exact' in df.columns and (df['frequency_exact'] > 0).any()
+    return list(_select_columns_for_schema(tuple(df.columns), bool(include_direct)))
+
+
+@lru_cache(maxsize=32)
+def _select_columns_for_schema(columns: Tuple[str, ...], include_direct: bool) -> Tuple[str, ...]:
+    """
+    Выбрать колонки для экспорта по набору колонок DataFrame
+    
+    Args:
+        columns: Колонки DataFrame
+        include_direct: Выводить колонки Yandex Direct
+        
+    Returns:
+        Кортеж названий колонок для экспорта
+    """
+    # Множество колонок - проверка наличия за O(1) вместо поиска по Index
+    available_columns = set(columns)
     
     # Порядок колонок согласно требованиям
     base_columns = [
@@ -49,10 +85,10 @@ def select_columns_for_export(df: pd.DataFrame) -> List[str]:
     ]
     
     # Фильтруем только существующие базовые колонки
-    priority_columns = [col for col in base_columns if col in df.columns]
+    priority_columns = [col for col in base_columns if col in available_columns]
     
     # Блок 5: Yandex Direct колонки - только если есть данные Direct И частотность
-    if has_direct_data and has_frequency_data:
+    if include_direct:
         direct_columns = [
             'direct_shows',
             'direct_clicks',
@@ -71,7 +107,7 @@ def select_columns_for_export(df: pd.DataFrame) -> List[str]:
             'direct_monthly_budget',
         ]
         # Добавляем только существующие Direct колонки
-        priority_columns.extend([col for col in direct_columns if col in df.columns])
+        priority_columns.extend([col for col in direct_columns if col in available_columns])
     
     # Блок 6: Приоритет и KEI метрики
     kei_and_priority_columns = [
@@ -85,7 +121,7 @@ def select_columns_for_export(df: pd.DataFrame) -> List[str]:
         'kei_synergy',               # KEI Синергия
         'kei_effectiveness_coefficient',  # KEI Коэффициент эффективности
     ]
-    priority_columns.extend([col for col in kei_and_priority_columns if col in df.columns])
+    priority_columns.extend([col for col in kei_and_priority_columns if col in available_columns])
     
     # Блок 7: Коммерческая ценность и SERP метрики
     value_and_serp_columns = [
@@ -96,10 +132,10 @@ def select_columns_for_export(df: pd.DataFrame) -> List[str]:
         'serp_internal_pages_count', # Кол-во внутренних
         # 'serp_commercial_domains', # СКРЫТО: не выводится в Excel
     ]
-    priority_columns.extend([col for col in value_and_serp_columns if col in df.columns])
+    priority_columns.extend([col for col in value_and_serp_columns if col in available_columns])
     
     # Блок 8: Перелинковка (В САМОМ КОНЦЕ)
-    if 'related_clusters' in df.columns:
+    if 'related_clusters' in available_columns:
         priority_columns.append('related_clusters')
     
     # ИСКЛЮЧАЕМ из экспорта (но не удаляем из кода):
@@ -110,5 +146,5 @@ def select_columns_for_export(df: pd.DataFrame) -> List[str]:
     # - serp_main_pages, serp_info_domains, serp_commercial_domains
     # - commercial_score, is_commercial, is_wholesale, is_urgent, query_pattern
     
-    return priority_columns
+    return tuple(priority_columns)
 
@@ -0,0 +1,90 @@
+"""
+Описание колонок листа: перевод, ширина, формат чисел и условное форматирование
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+import pandas as pd
+
+from .column_translator import translate_columns
+from ..sheet_formatter import get_column_width, get_number_format_key, get_conditional_format
+
+
+# Условное форматирование и автофильтр имеют смысл только от двух строк данных
+MIN_ROWS_FOR_FILTERS = 2
+
+
+@dataclass
+class ColumnSpec:
+    """Параметры вывода одной колонки на лист"""
+    src_name: str
+    out_name: str
+    width: int
+    cell_format: Optional[str] = None
+    cond_format: Optional[dict] = None
+
+
+def build_column_spec(df: pd.DataFrame) -> List[ColumnSpec]:
+    """
+    Построить описание колонок листа за один проход
+
+    Args:
+        df: DataFrame, который будет записан на лист
+
+    Returns:
+        Список ColumnSpec в порядке колонок DataFrame
+    """
+    specs = []
+    dtypes = df.dtypes
+    out_names = translate_columns(tuple(dtypes.index))
+
+    for (col_name, dtype), out_name in zip(dtypes.items(), out_names):
+        # Формат чисел применяем только к числовым колонкам
+        cell_format = None
+        if pd.api.types.is_numeric_dtype(dtype):
+            cell_format = get_number_format_key(col_name)
+
+        specs.append(ColumnSpec(
+            src_name=col_name,
+            out_name=out_name,
+            width=get_column_width(col_name),
+            cell_format=cell_format,
+            cond_format=get_conditional_format(col_name)
+        ))
+
+    return specs
+
+
+def write_column_specs(
+    worksheet,
+    specs: List[ColumnSpec],
+    formats: dict,
+    rows_count: int,
+    header_row: int = 0
+):
+    """
+    Записать заголовки, ширину, форматы чисел и условное форматирование колонок
+
+    Args:
+        worksheet: xlsxwriter worksheet объект
+        specs: Описание колонок (build_column_spec)
+        formats: Словарь с форматами
+        rows_count: Количество строк данных под заголовком
+        header_row: Номер строки заголовков
+    """
+    first_row = header_row + 1
+    last_row = header_row + rows_count
+
+    # Заголовки - одной строкой (список переводов готов в specs)
+    worksheet.write_row(header_row, 0, [spec.out_name for spec in specs], formats['header'])
+
+    # Цветовые шкалы на 0-1 строке ничего не показывают - не добавляем их
+    with_conditional_formats = rows_count >= MIN_ROWS_FOR_FILTERS
+
+    for col_num, spec in enumerate(specs):
+        # Формат колонки применяется ко всем ячейкам без собственного формата
+        cell_format = formats[spec.cell_format] if spec.cell_format else None
+        worksheet.set_column(col_num, col_num, spec.width, cell_format)
+
+        if spec.cond_format and with_conditional_formats:
+            worksheet.conditional_format(first_row, col_num, last_row, col_num, dict(spec.cond_format))
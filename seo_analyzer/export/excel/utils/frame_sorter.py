@@ -0,0 +1,71 @@
+"""
+Сортировка запросов для вывода на листы Excel
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _frequency_nan_as_zero(column: pd.Series) -> pd.Series:
+    """
+    Ключ сортировки: NaN в frequency_world считаем нулем
+
+    Args:
+        column: Колонка, по которой идет сортировка
+
+    Returns:
+        Колонка для сравнения при сортировке
+    """
+    if column.name == 'frequency_world':
+        return column.fillna(0)
+    return column
+
+
+def _cluster_sort_codes(cluster_ids: pd.Series) -> np.ndarray:
+    """
+    Целочисленные коды кластеров в порядке сортировки ID
+
+    Сравнение int-кодов вместо строк/float ID; пропуски получают
+    наибольший код (идут последними, как в sort_values).
+
+    Args:
+        cluster_ids: Колонка semantic_cluster_id
+        
+    Returns:
+        numpy-массив кодов
+    """
+    codes, uniques = pd.factorize(cluster_ids, sort=True)
+    codes[codes < 0] = len(uniques)
+    return codes
+
+
+def sort_for_export(df: pd.DataFrame, group_by_clusters: bool) -> pd.DataFrame:
+    """
+    Отсортировать запросы для листов (по кластеру и/или частоте)
+
+    Сортировка стабильная, поэтому фильтрация отсортированного DataFrame
+    дает тот же порядок, что и сортировка отфильтрованного.
+    По кластерам сортируются целочисленные коды (factorize), NaN частоты
+    считаются нулем - без копии всего DataFrame.
+
+    Args:
+        df: DataFrame с данными
+        group_by_clusters: Группировать по кластерам
+
+    Returns:
+        Отсортированный DataFrame (или исходный, если сортировать не по чему)
+    """
+    has_frequency = 'frequency_world' in df.columns
+
+    if group_by_clusters and 'semantic_cluster_id' in df.columns:
+        cluster_codes = _cluster_sort_codes(df['semantic_cluster_id'])
+        if has_frequency:
+            # lexsort стабильный: последний ключ - основной (кластер), частота - по убыванию
+            frequency = df['frequency_world'].fillna(0).to_numpy(dtype=float)
+            return df.iloc[np.lexsort((-frequency, cluster_codes))]
+        return df.iloc[np.argsort(cluster_codes, kind='stable')]
+
+    if has_frequency:
+        return df.sort_values('frequency_world', ascending=False, kind='mergesort', key=_frequency_nan_as_zero)
+
+    return df
@@ -0,0 +1,94 @@
+"""
+Доли коммерческих и информационных запросов по кластерам
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+# Интенты, которые считаются коммерческими
+COMMERCIAL_INTENTS = frozenset(('commercial', 'commercial_geo', 'transactional'))
+
+
+def factorize_clusters(cluster_ids: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Закодировать ID кластеров номерами 0..N-1 (по возрастанию ID)
+
+    Args:
+        cluster_ids: Колонка semantic_cluster_id
+
+    Returns:
+        Tuple (codes, cluster_index): код кластера для каждой строки
+        (-1 для пропусков) и индекс ID кластеров по кодам
+    """
+    codes, uniques = pd.factorize(cluster_ids, sort=True)
+    return codes, pd.Index(uniques, name=cluster_ids.name)
+
+
+def cluster_rows_mask(cluster_codes: np.ndarray, cluster_mask: np.ndarray) -> np.ndarray:
+    """
+    Маска строк по маске кластеров - индексацией по кодам, без isin
+
+    Args:
+        cluster_codes: Коды кластеров строк (factorize_clusters)
+        cluster_mask: Булева маска кластеров в порядке кодов
+
+    Returns:
+        Булева маска строк (строки без кластера - False)
+    """
+    # Дополнительный элемент False - для кода -1 (пропуск)
+    return np.append(np.asarray(cluster_mask, dtype=bool), False)[cluster_codes]
+
+
+def compute_cluster_intent_shares(
+    df: pd.DataFrame,
+    clusters: Optional[Tuple[np.ndarray, pd.Index]] = None
+) -> pd.DataFrame:
+    """
+    Посчитать доли интентов по кластерам за один проход
+
+    Таблица считается один раз и используется листами 'Коммерческие',
+    'Информационные' и 'Смешанные'. Количества считаются через np.bincount
+    по кодам кластеров - без построения групп.
+
+    Args:
+        df: DataFrame с колонками semantic_cluster_id и main_intent
+        clusters: Готовый результат factorize_clusters для df (None - посчитать)
+
+    Returns:
+        DataFrame с индексом semantic_cluster_id (по возрастанию) и колонками
+        total_count, commercial_count, informational_count,
+        commercial_ratio, informational_ratio; при наличии колонок Direct -
+        также direct_shows_count и frequency_exact_count (строки со значением > 0)
+    """
+    if clusters is None:
+        clusters = factorize_clusters(df['semantic_cluster_id'])
+    codes, cluster_index = clusters
+    intents = df['main_intent']
+
+    # Строки без кластера (код -1) не учитываются - как в groupby
+    has_cluster = codes >= 0
+    cluster_codes = codes[has_cluster]
+    clusters_count = len(cluster_index)
+
+    is_commercial = intents.isin(COMMERCIAL_INTENTS).to_numpy()[has_cluster]
+    is_informational = (intents == 'informational').to_numpy()[has_cluster]
+
+    shares = pd.DataFrame({
+        'total_count': np.bincount(cluster_codes, minlength=clusters_count),
+        'commercial_count': np.bincount(cluster_codes[is_commercial], minlength=clusters_count),
+        'informational_count': np.bincount(cluster_codes[is_informational], minlength=clusters_count)
+    }, index=cluster_index)
+
+    shares['commercial_ratio'] = shares['commercial_count'] / shares['total_count']
+    shares['informational_ratio'] = shares['informational_count'] / shares['total_count']
+
+    # Строки с данными Direct и частотностью - по ним листы решают, выводить ли
+    # колонки Direct (has_direct_export_data), не сканируя строки заново
+    if 'direct_shows' in df.columns and 'frequency_exact' in df.columns:
+        for column in ('direct_shows', 'frequency_exact'):
+            is_positive = (df[column] > 0).to_numpy()[has_cluster]
+            shares[f'{column}_count'] = np.bincount(cluster_codes[is_positive], minlength=clusters_count)
+
+    return shares
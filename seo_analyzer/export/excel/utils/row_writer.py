@@ -0,0 +1,168 @@
+"""
+Построчная запись DataFrame на лист (совместимо с constant_memory)
+
+В режиме constant_memory xlsxwriter сбрасывает строку на диск, как только
+начата следующая, поэтому ячейки нужно писать строго по строкам.
+DataFrame.to_excel пишет по колонкам, поэтому тело листа пишется здесь.
+Значения приводятся так же, как это делает pandas: NaN/NaT - пустая ячейка,
+inf - строка 'inf', числа и bool (включая numpy-скаляры) - как есть, дата и
+время - как даты Excel (формат default_date_format книги), остальное - через str().
+"""
+
+import math
+from datetime import date, datetime, time
+from typing import Any, List
+import numpy as np
+import pandas as pd
+
+
+# Как pandas записывает бесконечности (inf_rep по умолчанию)
+INF_REPRESENTATION = 'inf'
+
+
+def _to_cell_value(value: Any) -> Any:
+    """
+    Привести значение ячейки к типу, который пишет pandas.to_excel
+
+    Args:
+        value: Значение из DataFrame
+
+    Returns:
+        None (пустая ячейка), bool, int, float, str, datetime, date или time
+    """
+    if value is None:
+        return None
+
+    # numpy-скаляры (np.int64, np.float64, np.bool_) - в Python-тип, дальше как обычно
+    if isinstance(value, np.generic) and not isinstance(value, (np.datetime64, np.timedelta64)):
+        value = value.item()
+
+    if isinstance(value, (bool, int, float, str)):
+        if isinstance(value, float):
+            if value != value:
+                return None
+            if math.isinf(value):
+                return INF_REPRESENTATION if value > 0 else f"-{INF_REPRESENTATION}"
+        return value
+
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+
+    # Даты пишет xlsxwriter (write_row -> write_datetime); Timestamp - в datetime
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.datetime64):
+        return pd.Timestamp(value).to_pydatetime()
+    if isinstance(value, (datetime, date, time)):
+        return value
+
+    return str(value)
+
+
+def _float_column_values(values: np.ndarray) -> List[Any]:
+    """
+    Значения float-колонки: NaN и inf заменяются только в своих позициях
+
+    Args:
+        values: numpy-массив float
+
+    Returns:
+        Список значений ячеек
+    """
+    cells = values.tolist()
+
+    for idx in np.flatnonzero(~np.isfinite(values)).tolist():
+        value = cells[idx]
+        if value != value:
+            cells[idx] = None
+        else:
+            cells[idx] = INF_REPRESENTATION if value > 0 else f"-{INF_REPRESENTATION}"
+
+    return cells
+
+
+def _categorical_column_values(column: pd.Series) -> List[Any]:
+    """
+    Значения category-колонки: категории приводятся один раз, ячейки - по кодам
+
+    Args:
+        column: Колонка с dtype category
+
+    Returns:
+        Список значений ячеек
+    """
+    # Последний элемент - значение для кода -1 (пропуск)
+    category_values = _column_values(pd.Series(column.cat.categories)) + [None]
+    return [category_values[code] for code in column.cat.codes.tolist()]
+
+
+def _column_values(column: pd.Series) -> List[Any]:
+    """
+    Значения колонки в виде типизированного списка Python-объектов для записи
+
+    Числовые, bool и строковые колонки конвертируются целиком (tolist + маска
+    пропусков), category - через коды, поэлементное приведение - только для object.
+
+    Args:
+        column: Колонка DataFrame
+
+    Returns:
+        Список значений ячеек
+    """
+    dtype = column.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _categorical_column_values(column)
+
+    if not column.hasnans:
+        # int, bool и строки без пропусков: tolist() уже дает int/bool/str
+        if (
+            pd.api.types.is_integer_dtype(dtype)
+            or pd.api.types.is_bool_dtype(dtype)
+            or pd.api.types.is_string_dtype(dtype) and dtype != object
+        ):
+            return column.tolist()
+
+    if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        return _float_column_values(column.to_numpy())
+
+    return [_to_cell_value(value) for value in column.tolist()]
+
+
+def materialize_rows(df: pd.DataFrame) -> List[tuple]:
+    """
+    Подготовить строки DataFrame для записи (без обращения к листу)
+
+    Args:
+        df: DataFrame с данными
+
+    Returns:
+        Список кортежей значений ячеек (по строкам)
+    """
+    columns = [_column_values(df.iloc[:, col_num]) for col_num in range(df.shape[1])]
+    return list(zip(*columns))
+
+
+def write_rows(worksheet, rows: List[tuple], start_row: int = 1):
+    """
+    Записать подготовленные строки на лист по порядку
+
+    Args:
+        worksheet: xlsxwriter worksheet объект
+        rows: Строки из materialize_rows
+        start_row: Номер строки, с которой начинается запись
+    """
+    for row_num, row_values in enumerate(rows, start=start_row):
+        worksheet.write_row(row_num, 0, row_values)
+
+
+def write_dataframe_rows(worksheet, df: pd.DataFrame, start_row: int = 1):
+    """
+    Записать тело DataFrame на лист по строкам (без заголовков и индекса)
+
+    Args:
+        worksheet: xlsxwriter worksheet объект
+        df: DataFrame с данными
+        start_row: Номер строки, с которой начинается запись
+    """
+    write_rows(worksheet, materialize_rows(df), start_row)
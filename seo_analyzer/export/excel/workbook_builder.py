@@ -7,14 +7,13 @@ import pandas as pd
 from .sheet_formatter import create_formats
 from .data_writer import (
     create_all_queries_sheet,
-    create_top_priority_sheet,
-    create_clusters_summary_sheet,
     create_intent_summary_sheet,
-    create_lsi_sheet,
     create_intent_filtered_sheet,
     create_mixed_intent_sheet
 )
 from .faq_generator import create_faq_sheet
+from .utils.frame_sorter import sort_for_export
+from .utils.intent_shares import compute_cluster_intent_shares, factorize_clusters
 # ОТКЛЮЧЕНО: from .hierarchy_sheet import create_hierarchy_sheet
 
 
@@ -54,30 +53,64 @@ class ExcelExporter:
         print(f"📊 Создание Excel файла: {output_path.name}")
         
         # Создаем writer
-        with pd.ExcelWriter(output_path, engine='xlsxwriter', engine_kwargs={'options': {'strings_to_urls': False}}) as writer:
+        # constant_memory: xlsxwriter сбрасывает каждую строку на диск сразу после записи,
+        # поэтому все листы пишутся строго по строкам (см. utils.row_writer).
+        # DataFrame.to_excel пишет по колонкам и в этом режиме молча теряет ячейки -
+        # новые листы добавлять только через write_column_specs + write_dataframe_rows.
+        # strings_to_formulas: строки с '=' пишутся как текст - без проверки каждой строки
+        # и без формул из запросов
+        # default_date_format: даты из row_writer показываются так же, как у DataFrame.to_excel
+        workbook_options = {
+            'strings_to_urls': False,
+            'strings_to_formulas': False,
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+        }
+        with pd.ExcelWriter(output_path, engine='xlsxwriter', engine_kwargs={'options': workbook_options}) as writer:
             self.workbook = writer.book
             
             # Создаем форматы
             self.formats = create_formats(self.workbook)
             
+            # Интент кодируется один раз (category): сравнения, isin и groupby на всех
+            # листах работают по кодам, а не по хэшам строк; исходный df не меняется
+            if 'main_intent' in df.columns and not isinstance(df['main_intent'].dtype, pd.CategoricalDtype):
+                df = df.assign(main_intent=df['main_intent'].astype('category'))
+            
+            # Сортируем один раз - все листы с запросами используют общий порядок
+            df_sorted = sort_for_export(df, group_by_clusters)
+            
             # Лист 1: Все запросы
             print("  📄 Создание листа 'Все запросы'...")
-            create_all_queries_sheet(df, writer, self.formats, group_by_clusters)
+            create_all_queries_sheet(df_sorted, writer, self.formats, group_by_clusters, presorted=True)
             
-            # Лист 2: Коммерческие кластеры (>70% коммерческих запросов)
             if 'main_intent' in df.columns and 'semantic_cluster_id' in df.columns:
+                # Доли интентов по кластерам - один проход на три листа ниже. Коды кластеров
+                # считаются по отсортированному df: листы выбирают строки по кодам, без isin
+                clusters = factorize_clusters(df_sorted['semantic_cluster_id'])
+                intent_shares = compute_cluster_intent_shares(df_sorted, clusters)
+                cluster_codes = clusters[0]
+                
+                # Лист 2: Коммерческие кластеры (>70% коммерческих запросов)
                 print("  📄 Создание листа 'Коммерческие' (>70% коммерческих запросов)...")
-                create_intent_filtered_sheet(df, writer, self.formats, 'commercial', group_by_clusters)
-            
-            # Лист 3: Информационные кластеры (>70% информационных запросов)
-            if 'main_intent' in df.columns and 'semantic_cluster_id' in df.columns:
+                create_intent_filtered_sheet(
+                    df_sorted, writer, self.formats, 'commercial', group_by_clusters,
+                    presorted=True, intent_shares=intent_shares, cluster_codes=cluster_codes
+                )
+                
+                # Лист 3: Информационные кластеры (>70% информационных запросов)
                 print("  📄 Создание листа 'Информационные' (>70% информационных запросов)...")
-                create_intent_filtered_sheet(df, writer, self.formats, 'informational', group_by_clusters)
-            
-            # Лист 4: Смешанные кластеры (30-70% коммерческих запросов)
-            if 'main_intent' in df.columns and 'semantic_cluster_id' in df.columns:
+                create_intent_filtered_sheet(
+                    df_sorted, writer, self.formats, 'informational', group_by_clusters,
+                    presorted=True, intent_shares=intent_shares, cluster_codes=cluster_codes
+                )
+                
+                # Лист 4: Смешанные кластеры (30-70% коммерческих запросов)
                 print("  📄 Создание листа 'Смешанные' (30-70% коммерческих запросов)...")
-                create_mixed_intent_sheet(df, writer, self.formats, group_by_clusters)
+                create_mixed_intent_sheet(
+                    df_sorted, writer, self.formats, group_by_clusters,
+                    presorted=True, intent_shares=intent_shares, cluster_codes=cluster_codes
+                )
             
             # Лист 5: FAQ - справка по столбцам
             print("  📄 Создание листа 'FAQ'...")
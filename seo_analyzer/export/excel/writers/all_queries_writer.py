@@ -2,19 +2,60 @@
 Создание листа со всеми запросами
 """
 
+import os
 import pandas as pd
 
 from ..utils.column_selector import select_columns_for_export
-from ..utils.column_translator import get_column_translation
-from ..sheet_formatter import set_column_widths, add_conditional_formatting, apply_number_formats
+from ..utils.column_spec import build_column_spec, write_column_specs
+from ..utils.row_writer import write_dataframe_rows
+from ..utils.frame_sorter import sort_for_export
 from .lsi_converter import convert_query_lsi_phrases, convert_cluster_lsi_phrases
 
 
+# Диагностика частот при экспорте (SEO_DIAG=1) - несколько полных проходов по колонкам
+DIAG_EXPORT = os.environ.get('SEO_DIAG', '').lower() in ('1', 'true', 'yes')
+
+
+def _print_frequency_diagnostics(df_sorted: pd.DataFrame, df_export: pd.DataFrame):
+    """
+    Вывести диагностику частот (включается переменной окружения SEO_DIAG=1)
+    
+    Args:
+        df_sorted: Отсортированный исходный DataFrame
+        df_export: DataFrame для записи на лист
+    """
+    if 'frequency_world' in df_sorted.columns:
+        non_zero_before = (df_sorted['frequency_world'] > 0).sum()
+        print(f"  🔍 ДИАГНОСТИКА: В df_sorted до select_columns: {non_zero_before} из {len(df_sorted)} с ненулевой частотой")
+    
+    if 'frequency_world' in df_export.columns:
+        non_zero_freq_world = (df_export['frequency_world'] > 0).sum()
+        total_rows = len(df_export)
+        print(f"  ℹ️  Частота (мир): {non_zero_freq_world} из {total_rows} запросов с ненулевой частотой")
+        if non_zero_freq_world == 0 and total_rows > 0:
+            print(f"  ⚠️  ВНИМАНИЕ: Все частоты равны нулю! Проверьте данные в БД.")
+            # Проверяем исходные данные
+            if 'frequency_world' in df_sorted.columns:
+                original_non_zero = (df_sorted['frequency_world'] > 0).sum()
+                print(f"  ℹ️  В исходном DataFrame: {original_non_zero} из {len(df_sorted)} с ненулевой частотой")
+                # Дополнительная диагностика
+                print(f"  ℹ️  Тип данных frequency_world в df_sorted: {df_sorted['frequency_world'].dtype}")
+                print(f"  ℹ️  Тип данных frequency_world в df_export: {df_export['frequency_world'].dtype}")
+                print(f"  ℹ️  Примеры значений в df_sorted: {df_sorted['frequency_world'].head(10).tolist()}")
+                print(f"  ℹ️  Примеры значений в df_export: {df_export['frequency_world'].head(10).tolist()}")
+    
+    if 'frequency_exact' in df_export.columns:
+        non_zero_freq_exact = (df_export['frequency_exact'] > 0).sum()
+        total_rows = len(df_export)
+        print(f"  ℹ️  Частота (точная): {non_zero_freq_exact} из {total_rows} запросов с ненулевой частотой")
+
+
 def create_all_queries_sheet(
     df: pd.DataFrame,
     writer: pd.ExcelWriter,
     formats: dict,
-    group_by_clusters: bool
+    group_by_clusters: bool,
+    presorted: bool = False
 ):
     """
     Создать лист со всеми запросами
@@ -24,32 +65,12 @@ def create_all_queries_sheet(
         writer: ExcelWriter объект
         formats: Словарь с форматами
         group_by_clusters: Группировать по кластерам
+        presorted: df уже отсортирован sort_for_export
     """
     sheet_name = 'Все запросы'
     
-    # Сортируем
-    # Проверяем наличие колонки frequency_world перед сортировкой
-    if group_by_clusters and 'semantic_cluster_id' in df.columns:
-        if 'frequency_world' in df.columns:
-            # Заменяем NaN на 0 для корректной сортировки
-            df_sorted = df.copy()
-            df_sorted['frequency_world'] = df_sorted['frequency_world'].fillna(0)
-            df_sorted = df_sorted.sort_values(['semantic_cluster_id', 'frequency_world'], ascending=[True, False])
-        else:
-            df_sorted = df.sort_values('semantic_cluster_id', ascending=True)
-    else:
-        if 'frequency_world' in df.columns:
-            # Заменяем NaN на 0 для корректной сортировки
-            df_sorted = df.copy()
-            df_sorted['frequency_world'] = df_sorted['frequency_world'].fillna(0)
-            df_sorted = df_sorted.sort_values('frequency_world', ascending=False)
-        else:
-            df_sorted = df.copy()
-    
-    # Диагностика частот ДО выбора колонок
-    if 'frequency_world' in df_sorted.columns:
-        non_zero_before = (df_sorted['frequency_world'] > 0).sum()
-        print(f"  🔍 ДИАГНОСТИКА: В df_sorted до select_columns: {non_zero_before} из {len(df_sorted)} с ненулевой частотой")
+    # Сортируем (если DataFrame не отсортирован заранее)
+    df_sorted = df if presorted else sort_for_export(df, group_by_clusters)
     
     # Выбираем колонки для экспорта
     columns_to_export = select_columns_for_export(df_sorted)
@@ -63,60 +84,45 @@ def create_all_queries_sheet(
     if 'frequency_exact' not in columns_to_export and 'frequency_exact' in df_sorted.columns:
         print(f"  ⚠️  ВНИМАНИЕ: frequency_exact не включена в columns_to_export!")
     
-    df_export = df_sorted[columns_to_export].copy()
-    
-    # Диагностика частот перед экспортом
-    if 'frequency_world' in df_export.columns:
-        non_zero_freq_world = (df_export['frequency_world'] > 0).sum()
-        total_rows = len(df_export)
-        print(f"  ℹ️  Частота (мир): {non_zero_freq_world} из {total_rows} запросов с ненулевой частотой")
-        if non_zero_freq_world == 0 and total_rows > 0:
-            print(f"  ⚠️  ВНИМАНИЕ: Все частоты равны нулю! Проверьте данные в БД.")
-            # Проверяем исходные данные
-            if 'frequency_world' in df_sorted.columns:
-                original_non_zero = (df_sorted['frequency_world'] > 0).sum()
-                print(f"  ℹ️  В исходном DataFrame: {original_non_zero} из {len(df_sorted)} с ненулевой частотой")
-                # Дополнительная диагностика
-                print(f"  ℹ️  Тип данных frequency_world в df_sorted: {df_sorted['frequency_world'].dtype}")
-                print(f"  ℹ️  Тип данных frequency_world в df_export: {df_export['frequency_world'].dtype}")
-                print(f"  ℹ️  Примеры значений в df_sorted: {df_sorted['frequency_world'].head(10).tolist()}")
-                print(f"  ℹ️  Примеры значений в df_export: {df_export['frequency_world'].head(10).tolist()}")
+    # Заменяемые колонки считаем отдельными массивами и подставляем через assign -
+    # без полной копии выгружаемых колонок (остальные колонки не копируются)
+    replaced_columns = {}
     
-    if 'frequency_exact' in df_export.columns:
-        non_zero_freq_exact = (df_export['frequency_exact'] > 0).sum()
-        total_rows = len(df_export)
-        print(f"  ℹ️  Частота (точная): {non_zero_freq_exact} из {total_rows} запросов с ненулевой частотой")
+    # Заменяем NaN на 0 только в выгружаемой колонке частоты
+    if 'frequency_world' in columns_to_export:
+        replaced_columns['frequency_world'] = df_sorted['frequency_world'].fillna(0)
     
     # Конвертируем списки в строки для Excel (только для LSI фраз)
-    if 'lsi_phrases' in df_export.columns:
-        df_export['lsi_phrases'] = df_export['lsi_phrases'].apply(convert_query_lsi_phrases)
+    # Проход по numpy-массиву без Series.apply - без накладных расходов pandas на строку
+    if 'lsi_phrases' in columns_to_export:
+        replaced_columns['lsi_phrases'] = [
+            convert_query_lsi_phrases(x) for x in df_sorted['lsi_phrases'].to_numpy()
+        ]
     
     # Конвертируем cluster_lsi_phrases если есть (список словарей -> строка)
-    if 'cluster_lsi_phrases' in df_export.columns:
-        df_export['cluster_lsi_phrases'] = df_export['cluster_lsi_phrases'].apply(convert_cluster_lsi_phrases)
+    if 'cluster_lsi_phrases' in columns_to_export:
+        replaced_columns['cluster_lsi_phrases'] = [
+            convert_cluster_lsi_phrases(x) for x in df_sorted['cluster_lsi_phrases'].to_numpy()
+        ]
+    
+    df_export = df_sorted[columns_to_export].assign(**replaced_columns)
+    
+    # Диагностика частот (полные проходы по колонкам) - только при SEO_DIAG=1
+    if DIAG_EXPORT:
+        _print_frequency_diagnostics(df_sorted, df_export)
     
-    # Записываем в Excel
-    df_export.to_excel(writer, sheet_name=sheet_name, index=False, startrow=1, header=False)
+    worksheet = writer.book.add_worksheet(sheet_name)
     
-    worksheet = writer.sheets[sheet_name]
+    # Заголовки (с переводом на русский), ширина, форматы чисел и условное
+    # форматирование - до данных: в режиме constant_memory строки пишутся по порядку
+    write_column_specs(worksheet, build_column_spec(df_export), formats, len(df_export))
     
-    # Записываем заголовки с переводом на русский
-    for col_num, col_name in enumerate(df_export.columns):
-        russian_name = get_column_translation(col_name)
-        worksheet.write(0, col_num, russian_name, formats['header'])
+    # Записываем данные построчно
+    write_dataframe_rows(worksheet, df_export, start_row=1)
     
     # Настройки листа
     worksheet.freeze_panes(1, 0)  # Заморозить первую строку
     
     # Автофильтр
     worksheet.autofilter(0, 0, len(df_export), len(df_export.columns) - 1)
-    
-    # Настройка ширины колонок
-    set_column_widths(worksheet, df_export.columns)
-    
-    # Применяем форматирование чисел
-    apply_number_formats(worksheet, df_export, formats)
-    
-    # Условное форматирование
-    add_conditional_formatting(worksheet, df_export, sheet_name)
 
@@ -2,17 +2,91 @@
 Экспорт кластеров по отдельным листам с классификацией по коммерческим факторам
 """
 
+import os
+import re
+import numpy as np
 import pandas as pd
-from typing import Dict, Tuple, Set
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Tuple, Set
 from pathlib import Path
 
 from seo_analyzer.core.lemmatizer import lemmatize_phrase
 from ..utils.column_selector import select_columns_for_export
-from ..utils.column_translator import get_column_translation
-from ..sheet_formatter import set_column_widths, add_conditional_formatting, apply_number_formats
+from ..utils.column_spec import MIN_ROWS_FOR_FILTERS, build_column_spec, write_column_specs
+from ..utils.row_writer import materialize_rows, write_rows
 from .lsi_converter import convert_query_lsi_phrases, convert_cluster_lsi_phrases
 
 
+# Количество потоков для подготовки листов кластеров
+CLUSTER_PREP_WORKERS = min(32, os.cpu_count() or 1)
+
+# Строка файла коммерческих слов: слово до '#' (комментарий), без пробелов по краям
+COMMERCIAL_KEYWORD_LINE_RE = re.compile(r'(?m)^\s*([^#\s][^#\n]*?)\s*(?:#.*)?$')
+
+# Сколько листов готовится наперед (строки листов пачки держатся в памяти до записи)
+CLUSTER_PREP_BATCH = CLUSTER_PREP_WORKERS * 4
+
+# Размер кэша лемм запросов (процесс GUI живет долго - кэш ограничен)
+QUERY_LEMMA_CACHE_SIZE = 100_000
+
+# Параметры numba-движка groupby (включается SEO_NUMBA=1 при установленном numba)
+NUMBA_ENGINE_KWARGS = {'nopython': True, 'nogil': True, 'parallel': True}
+
+
+@lru_cache(maxsize=1)
+def _is_numba_groupby_enabled() -> bool:
+    """
+    Проверить, включена ли агрегация кластеров через numba (один раз за процесс)
+    
+    numba импортируется лениво; при включении JIT прогревается на маленьком
+    DataFrame, чтобы компиляция не попадала на первый реальный экспорт.
+    
+    Returns:
+        True если SEO_NUMBA=1, numba установлен и прогрев прошел успешно
+    """
+    if os.environ.get('SEO_NUMBA') != '1':
+        return False
+    
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        print("⚠️ SEO_NUMBA=1, но numba не установлен - используем стандартный groupby")
+        return False
+    
+    try:
+        warmup_df = pd.DataFrame({'cluster': [0, 0, 1], 'value': [1.0, float('nan'), 2.0]})
+        warmup_df.groupby('cluster')[['value']].sum(engine='numba', engine_kwargs=NUMBA_ENGINE_KWARGS)
+    except Exception as e:
+        print(f"⚠️ numba groupby недоступен ({e}), используем стандартный groupby")
+        return False
+    
+    return True
+
+
+def _column_total(column: pd.Series) -> int:
+    """
+    Сумма колонки с пропусками как 0 (по numpy-массиву, без копии fillna).
+    
+    Args:
+        column: Колонка с числами
+        
+    Returns:
+        Сумма значений
+    """
+    values = column.to_numpy()
+    
+    # int и bool не содержат NaN - обычная сумма
+    if values.dtype.kind in 'iub':
+        return int(values.sum())
+    
+    if values.dtype.kind == 'f':
+        return int(np.nansum(values))
+    
+    # object и nullable-типы - через pandas
+    return int(column.fillna(0).sum())
+
+
 def calculate_cluster_commercial_factors(
     cluster_df: pd.DataFrame,
     commercial_domains_column: str = 'serp_commercial_domains',
@@ -40,60 +114,209 @@ def calculate_cluster_commercial_factors(
     
     # Суммируем коммерческие домены
     if commercial_domains_column in cluster_df.columns:
-        total_domains = int(cluster_df[commercial_domains_column].fillna(0).sum())
+        total_domains = _column_total(cluster_df[commercial_domains_column])
     
     # Суммируем offers (проверяем обе возможные колонки)
     if offers_column in cluster_df.columns:
-        total_offers = int(cluster_df[offers_column].fillna(0).sum())
+        total_offers = _column_total(cluster_df[offers_column])
     elif 'serp_offers_count' in cluster_df.columns:
         # Альтернативная колонка для offers
-        total_offers = int(cluster_df['serp_offers_count'].fillna(0).sum())
+        total_offers = _column_total(cluster_df['serp_offers_count'])
     
     total_factors = total_domains + total_offers
     
     return (total_domains, total_offers, total_factors)
 
 
-def _load_commercial_keywords(commercial_keywords_file: Path = None) -> Set[str]:
+def calculate_clusters_commercial_factors(
+    df: pd.DataFrame,
+    cluster_column: str = 'semantic_cluster_id',
+    commercial_domains_column: str = 'serp_commercial_domains',
+    offers_column: str = 'serp_docs_with_offers',
+    cluster_keys: Optional[pd.Series] = None
+) -> pd.DataFrame:
+    """
+    Рассчитывает коммерческие факторы сразу для всех кластеров (один groupby).
+    
+    Векторизованный аналог calculate_cluster_commercial_factors: те же суммы
+    (пропуски считаются нулем, дробная часть суммы отбрасывается).
+    
+    Args:
+        df: DataFrame с запросами всех кластеров
+        cluster_column: Название колонки с ID кластера
+        commercial_domains_column: Название колонки с коммерческими доменами
+        offers_column: Название колонки с документами с offer_info
+        cluster_keys: Готовые ключи группировки (category по cluster_column);
+            None - группировка по самой колонке
+        
+    Returns:
+        DataFrame с индексом ID кластера (по возрастанию) и колонками
+        total_domains, total_offers, total_factors
+    """
+    # Колонка offers: основная или альтернативная serp_offers_count
+    if offers_column not in df.columns and 'serp_offers_count' in df.columns:
+        offers_column = 'serp_offers_count'
+    
+    source_columns = {
+        'total_domains': commercial_domains_column,
+        'total_offers': offers_column
+    }
+    present_columns = [col for col in source_columns.values() if col in df.columns]
+    
+    if cluster_keys is None:
+        cluster_keys = df[cluster_column]
+    
+    # SERP-обогащение не запускалось (все факторы 0 или пусты) - суммы по кластерам
+    # заведомо нулевые, groupby не нужен
+    if not any((df[col].fillna(0) != 0).any() for col in present_columns):
+        cluster_ids = pd.Index(cluster_keys.dropna().unique(), name=cluster_column).sort_values()
+        return pd.DataFrame(0, index=cluster_ids, columns=['total_domains', 'total_offers', 'total_factors'], dtype='int64')
+    
+    # sum() пропускает NaN - то же, что fillna(0).sum()
+    # (numba-движок распараллеливает агрегацию по ядрам при SEO_NUMBA=1)
+    grouped = df.groupby(cluster_keys, observed=True)[present_columns]
+    if present_columns and _is_numba_groupby_enabled():
+        sums = grouped.sum(engine='numba', engine_kwargs=NUMBA_ENGINE_KWARGS)
+    else:
+        sums = grouped.sum()
+    
+    factors = pd.DataFrame(index=sums.index)
+    for total_name, source_column in source_columns.items():
+        if source_column in sums.columns:
+            factors[total_name] = sums[source_column].astype('int64')
+        else:
+            factors[total_name] = 0
+    
+    factors['total_factors'] = factors['total_domains'] + factors['total_offers']
+    
+    return factors
+
+
+def _load_commercial_keywords(commercial_keywords_file: Path = None) -> FrozenSet[str]:
     """
     Загружает коммерческие ключевые слова из файла.
     
+    Файл читается и лемматизируется один раз на (путь, время изменения, размер):
+    повторные вызовы (в том числе из разных экспортов) возвращают готовое множество.
+    
     Args:
         commercial_keywords_file: Путь к файлу с коммерческими ключевыми словами
         
     Returns:
         Множество ключевых слов (в нижнем регистре, лемматизированных)
     """
-    keywords = set()
-    
     # Путь относительно корня проекта
     if commercial_keywords_file is None:
         base_dir = Path(__file__).parent.parent.parent.parent.parent
         commercial_keywords_file = base_dir / 'keyword_group' / 'commercial.txt'
     
-    if not commercial_keywords_file.exists():
-        return keywords
+    try:
+        file_stat = commercial_keywords_file.stat()
+    except FileNotFoundError:
+        return frozenset()
     
+    return _read_commercial_keywords(str(commercial_keywords_file), file_stat.st_mtime_ns, file_stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _read_commercial_keywords(file_path: str, mtime_ns: int, size: int) -> FrozenSet[str]:
+    """
+    Читает и лемматизирует коммерческие ключевые слова (кэш по пути, mtime и размеру).
+    
+    Args:
+        file_path: Путь к файлу с коммерческими ключевыми словами
+        mtime_ns: Время изменения файла (ключ кэша - изменение файла сбрасывает кэш)
+        size: Размер файла в байтах (ключ кэша - ловит правку в пределах точности mtime)
+        
+    Returns:
+        Множество ключевых слов (в нижнем регистре, лемматизированных)
+    """
     try:
-        with open(commercial_keywords_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                
-                # Пропускаем комментарии и пустые строки
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Убираем комментарии в конце строки
-                keyword = line.split('#')[0].strip()
-                
-                if keyword:
-                    # Лемматизируем ключевое слово для сравнения в любом падеже
-                    keyword_lemmatized = lemmatize_phrase(keyword.lower())
-                    keywords.add(keyword_lemmatized)
+        text = Path(file_path).read_text(encoding='utf-8')
     except Exception as e:
         print(f"⚠️ Ошибка при загрузке коммерческих ключевых слов: {e}")
+        return frozenset()
     
-    return keywords
+    # Ключевые слова без комментариев и пустых строк - одним проходом по тексту;
+    # лемматизируем каждое уникальное слово один раз (для сравнения в любом падеже)
+    raw_keywords = {keyword.lower() for keyword in COMMERCIAL_KEYWORD_LINE_RE.findall(text)}
+    keywords = {lemmatize_phrase(keyword) for keyword in raw_keywords}
+    
+    return frozenset(keywords)
+
+
+@lru_cache(maxsize=QUERY_LEMMA_CACHE_SIZE)
+def _query_lemma_tokens(query_lower: str) -> FrozenSet[str]:
+    """
+    Лемматизированные слова запроса (кэш на QUERY_LEMMA_CACHE_SIZE запросов).
+    
+    Один и тот же запрос встречается во многих кластерах и прогонах,
+    а кэш lemmatize_phrase меньше - здесь лемматизация выполняется
+    один раз на уникальную строку.
+    
+    Args:
+        query_lower: Запрос в нижнем регистре
+        
+    Returns:
+        Множество лемм запроса
+    """
+    return frozenset(lemmatize_phrase(query_lower).split())
+
+
+def _commercial_keyword_mask(
+    df: pd.DataFrame,
+    query_column: str,
+    commercial_keywords: FrozenSet[str]
+) -> pd.Series:
+    """
+    Для каждой строки: содержит ли запрос коммерческое ключевое слово.
+    
+    Лемматизируются только уникальные запросы (в нижнем регистре),
+    результат раскладывается на строки через map.
+    
+    Args:
+        df: DataFrame с запросами
+        query_column: Название колонки с запросами
+        commercial_keywords: Множество коммерческих ключевых слов (лемматизированных)
+        
+    Returns:
+        Булева Series с индексом df
+    """
+    queries = df[query_column].dropna().astype(str).str.lower()
+    
+    has_keyword = {
+        query_lower: bool(query_lower) and not _query_lemma_tokens(query_lower).isdisjoint(commercial_keywords)
+        for query_lower in pd.unique(queries)
+    }
+    
+    return queries.map(has_keyword).reindex(df.index, fill_value=False).astype(bool)
+
+
+def _clusters_with_commercial_keywords(
+    df: pd.DataFrame,
+    cluster_column: str,
+    query_column: str = 'keyword',
+    commercial_keywords: Set[str] = None
+) -> pd.Series:
+    """
+    Для каждого кластера: есть ли хотя бы один запрос с коммерческим словом.
+    
+    Один проход по всему DataFrame вместо проверки каждого кластера отдельно.
+    
+    Args:
+        df: DataFrame с запросами всех кластеров
+        cluster_column: Название колонки с ID кластера
+        query_column: Название колонки с запросами
+        commercial_keywords: Множество коммерческих ключевых слов (лемматизированных)
+        
+    Returns:
+        Булева Series с индексом ID кластера
+    """
+    if not commercial_keywords or query_column not in df.columns:
+        return pd.Series(False, index=df.groupby(cluster_column).size().index, dtype=bool)
+    
+    mask = _commercial_keyword_mask(df, query_column, frozenset(commercial_keywords))
+    return mask.groupby(df[cluster_column]).any()
 
 
 def _has_commercial_keyword_in_cluster(
@@ -118,20 +341,7 @@ def _has_commercial_keyword_in_cluster(
     if query_column not in cluster_df.columns:
         return False
     
-    # Проверяем каждый запрос в кластере
-    for query in cluster_df[query_column]:
-        if pd.isna(query) or not query:
-            continue
-        
-        # Лемматизируем запрос для сравнения
-        query_lemmatized = lemmatize_phrase(str(query).lower())
-        query_words = set(query_lemmatized.split())
-        
-        # Проверяем есть ли коммерческое слово в запросе
-        if query_words & commercial_keywords:
-            return True
-    
-    return False
+    return bool(_commercial_keyword_mask(cluster_df, query_column, frozenset(commercial_keywords)).any())
 
 
 def classify_cluster_by_factors(
@@ -190,25 +400,68 @@ def create_cluster_sheets(
         print(f"ℹ️  Пропускаем создание листов кластеров - нет колонок с коммерческими факторами")
         return
     
-    # Группируем по кластерам
-    cluster_groups = df.groupby(cluster_column)
+    # Конвертируем LSI фразы в строки один раз для всего DataFrame
+    # (исходный DataFrame не меняется - колонки подставляются через assign)
+    lsi_columns = {}
+    if 'lsi_phrases' in df.columns:
+        lsi_columns['lsi_phrases'] = [convert_query_lsi_phrases(x) for x in df['lsi_phrases'].to_numpy()]
+    
+    if 'cluster_lsi_phrases' in df.columns:
+        lsi_columns['cluster_lsi_phrases'] = [
+            convert_cluster_lsi_phrases(x) for x in df['cluster_lsi_phrases'].to_numpy()
+        ]
+    
+    if lsi_columns:
+        df = df.assign(**lsi_columns)
+    
+    # Сортируем запросы по частоте один раз для всего DataFrame (стабильно):
+    # groupby сохраняет порядок строк внутри группы, поэтому каждый кластер
+    # получается уже отсортированным
+    if 'frequency_world' in df.columns:
+        df = df.sort_values('frequency_world', ascending=False, kind='mergesort')
+    elif 'frequency_exact' in df.columns:
+        df = df.sort_values('frequency_exact', ascending=False, kind='mergesort')
+    
+    # Ключи кластеров кодируются один раз (category) - все groupby ниже используют
+    # готовые коды вместо хэширования колонки. Сама колонка в df не меняется
+    # (на листах остается числовой)
+    cluster_keys = df[cluster_column].astype('category')
+    
+    # Коммерческие факторы всех кластеров - одной агрегацией
+    cluster_factors = calculate_clusters_commercial_factors(
+        df,
+        cluster_column,
+        commercial_domains_col,
+        offers_col,
+        cluster_keys=cluster_keys
+    )
+    
+    # Наличие данных Direct по кластерам (для выбора колонок листа) - одним groupby
+    if 'direct_shows' in df.columns and 'frequency_exact' in df.columns:
+        has_direct = (df['direct_shows'] > 0).groupby(cluster_keys, observed=True).any()
+        has_frequency = (df['frequency_exact'] > 0).groupby(cluster_keys, observed=True).any()
+        cluster_include_direct = (has_direct & has_frequency).tolist()
+    else:
+        cluster_include_direct = [False] * len(cluster_factors)
+    
+    # Группируем по кластерам (порядок групп совпадает с порядком агрегатов выше)
+    cluster_groups = df.groupby(cluster_keys, observed=True)
     
     commercial_clusters = []
     informational_clusters = []
     
     # Классифицируем каждый кластер
-    for cluster_id, cluster_df in cluster_groups:
+    for (cluster_id, cluster_df), total_domains, total_offers, total_factors, include_direct in zip(
+        cluster_groups,
+        cluster_factors['total_domains'].tolist(),
+        cluster_factors['total_offers'].tolist(),
+        cluster_factors['total_factors'].tolist(),
+        cluster_include_direct
+    ):
         # Пропускаем пустые кластеры
         if len(cluster_df) == 0:
             continue
         
-        # Рассчитываем коммерческие факторы (сумма по всем запросам кластера)
-        total_domains, total_offers, total_factors = calculate_cluster_commercial_factors(
-            cluster_df,
-            commercial_domains_col,
-            offers_col
-        )
-        
         # Классифицируем кластер по сумме факторов
         # Если сумма >= 12, то кластер коммерческий
         cluster_intent = classify_cluster_by_factors(total_factors, commercial_threshold)
@@ -220,7 +473,8 @@ def create_cluster_sheets(
             'total_offers': total_offers,
             'total_factors': total_factors,
             'intent': cluster_intent,
-            'size': len(cluster_df)
+            'size': len(cluster_df),
+            'include_direct': include_direct
         }
         
         if cluster_intent == 'commercial':
@@ -232,41 +486,34 @@ def create_cluster_sheets(
     commercial_clusters.sort(key=lambda x: x['size'], reverse=True)
     informational_clusters.sort(key=lambda x: x['size'], reverse=True)
     
-    # Создаем листы для коммерческих кластеров
-    for cluster_info in commercial_clusters:
-        _create_single_cluster_sheet(
-            cluster_info,
-            writer,
-            formats,
-            cluster_column
-        )
-    
-    # Создаем листы для информационных кластеров
-    for cluster_info in informational_clusters:
-        _create_single_cluster_sheet(
-            cluster_info,
-            writer,
-            formats,
-            cluster_column
-        )
+    # Подготовка листов (выбор колонок, описание колонок, значения строк) независима
+    # для каждого кластера - выполняем в пуле потоков. Запись в книгу (xlsxwriter не
+    # потокобезопасен) - в основном потоке: сначала коммерческие, затем информационные.
+    # Кластеры подаются пачками, чтобы в памяти не держать строки всех листов сразу
+    ordered_clusters = commercial_clusters + informational_clusters
+    
+    with ThreadPoolExecutor(max_workers=CLUSTER_PREP_WORKERS) as executor:
+        for batch_start in range(0, len(ordered_clusters), CLUSTER_PREP_BATCH):
+            batch = ordered_clusters[batch_start:batch_start + CLUSTER_PREP_BATCH]
+            for prepared_sheet in executor.map(_prepare_cluster_sheet, batch):
+                _write_cluster_sheet(prepared_sheet, writer, formats)
     
     print(f"  ✓ Создано листов кластеров: {len(commercial_clusters)} коммерческих, {len(informational_clusters)} информационных")
 
 
-def _create_single_cluster_sheet(
-    cluster_info: Dict,
-    writer: pd.ExcelWriter,
-    formats: dict,
-    cluster_column: str
-):
+def _prepare_cluster_sheet(cluster_info: Dict) -> Dict:
     """
-    Создает один лист для кластера.
+    Подготавливает данные листа кластера (без записи в книгу).
+    
+    Не обращается к workbook, поэтому выполняется в пуле потоков.
+    Запросы кластера уже отсортированы по частоте (create_cluster_sheets).
     
     Args:
         cluster_info: Словарь с информацией о кластере
-        writer: ExcelWriter объект
-        formats: Словарь с форматами
-        cluster_column: Название колонки с ID кластера
+        
+    Returns:
+        Словарь с названием листа, строкой метаданных, описанием колонок
+        и готовыми значениями строк
     """
     cluster_id = cluster_info['cluster_id']
     cluster_df = cluster_info['cluster_df']
@@ -284,46 +531,57 @@ def _create_single_cluster_sheet(
     if len(sheet_name) > 31:
         sheet_name = sheet_name[:31]
     
-    # Сортируем запросы по частоте
-    if 'frequency_world' in cluster_df.columns:
-        cluster_df = cluster_df.sort_values('frequency_world', ascending=False)
-    elif 'frequency_exact' in cluster_df.columns:
-        cluster_df = cluster_df.sort_values('frequency_exact', ascending=False)
+    # Выбираем колонки для экспорта (LSI фразы уже сконвертированы в строки
+    # в create_cluster_sheets - копия и поячеечная конвертация не нужны;
+    # наличие данных Direct посчитано для всех кластеров заранее)
+    columns_to_export = select_columns_for_export(cluster_df, cluster_info.get('include_direct'))
+    df_export = cluster_df[columns_to_export]
     
-    # Выбираем колонки для экспорта
-    columns_to_export = select_columns_for_export(cluster_df)
-    df_export = cluster_df[columns_to_export].copy()
-    
-    # Конвертируем LSI фразы
-    if 'lsi_phrases' in df_export.columns:
-        df_export['lsi_phrases'] = df_export['lsi_phrases'].apply(convert_query_lsi_phrases)
+    # Метаданные кластера для первой строки
+    intent_ru = 'Коммерческий' if intent == 'commercial' else 'Информационный'
+    cluster_meta = f"Кластер {cluster_num} | {intent_ru} | Коммерческих факторов: {total_factors} (домены: {cluster_info['total_domains']}, offer: {cluster_info['total_offers']})"
     
-    if 'cluster_lsi_phrases' in df_export.columns:
-        df_export['cluster_lsi_phrases'] = df_export['cluster_lsi_phrases'].apply(convert_cluster_lsi_phrases)
+    return {
+        'sheet_name': sheet_name,
+        'cluster_meta': cluster_meta,
+        'column_specs': build_column_spec(df_export),
+        'rows': materialize_rows(df_export),
+        'columns_count': len(columns_to_export)
+    }
+
+
+def _write_cluster_sheet(
+    prepared_sheet: Dict,
+    writer: pd.ExcelWriter,
+    formats: dict
+):
+    """
+    Записывает подготовленный лист кластера в книгу.
     
-    # Записываем в Excel (начинаем с строки 2, чтобы первая строка была для метаданных)
-    df_export.to_excel(writer, sheet_name=sheet_name, index=False, startrow=2, header=False)
+    Args:
+        prepared_sheet: Результат _prepare_cluster_sheet
+        writer: ExcelWriter объект
+        formats: Словарь с форматами
+    """
+    rows = prepared_sheet['rows']
     
-    worksheet = writer.sheets[sheet_name]
+    worksheet = writer.book.add_worksheet(prepared_sheet['sheet_name'])
     
+    # Строки пишутся по порядку (совместимо с constant_memory):
+    # метаданные, заголовки, затем данные со строки 2
     # Записываем метаданные кластера в первую строку
-    cluster_num = cluster_id + 1 if isinstance(cluster_id, int) else str(cluster_id)
-    intent_ru = 'Коммерческий' if intent == 'commercial' else 'Информационный'
-    cluster_meta = f"Кластер {cluster_num} | {intent_ru} | Коммерческих факторов: {total_factors} (домены: {cluster_info['total_domains']}, offer: {cluster_info['total_offers']})"
-    worksheet.write(0, 0, cluster_meta, formats.get('header', None))
+    worksheet.write(0, 0, prepared_sheet['cluster_meta'], formats.get('header', None))
+    
+    # Заголовки (с переводом на русский), ширина, форматы чисел и условное
+    # форматирование - за один проход по колонкам
+    write_column_specs(worksheet, prepared_sheet['column_specs'], formats, len(rows), header_row=1)
     
-    # Записываем заголовки с переводом на русский во вторую строку
-    for col_num, col_name in enumerate(df_export.columns):
-        russian_name = get_column_translation(col_name)
-        worksheet.write(1, col_num, russian_name, formats['header'])
+    # Записываем подготовленные строки по порядку
+    write_rows(worksheet, rows, start_row=2)
     
     # Настройки листа (замораживаем строку с заголовками)
     worksheet.freeze_panes(2, 0)
-    # Автофильтр начинается со строки заголовков (строка 1)
-    worksheet.autofilter(1, 0, len(df_export) + 1, len(df_export.columns) - 1)
-    
-    # Форматирование
-    set_column_widths(worksheet, df_export.columns)
-    apply_number_formats(worksheet, df_export, formats)
-    add_conditional_formatting(worksheet, df_export, sheet_name)
-
+    # Автофильтр начинается со строки заголовков (строка 1); для листа из одного
+    # запроса (частый случай для мелких кластеров) фильтр не нужен
+    if len(rows) >= MIN_ROWS_FOR_FILTERS:
+        worksheet.autofilter(1, 0, len(rows) + 1, prepared_sheet['columns_count'] - 1)
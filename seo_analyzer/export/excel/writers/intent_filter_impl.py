@@ -2,12 +2,116 @@
 Базовая реализация создания листов с фильтрацией по интентам
 """
 
+from typing import Optional
+import numpy as np
 import pandas as pd
 
 from ..utils.column_selector import select_columns_for_export
-from ..utils.column_translator import get_column_translation
-from ..sheet_formatter import set_column_widths, add_conditional_formatting, apply_number_formats
+from ..utils.column_spec import MIN_ROWS_FOR_FILTERS, build_column_spec, write_column_specs
+from ..utils.row_writer import write_dataframe_rows
+from ..utils.frame_sorter import sort_for_export
+from ..utils.intent_shares import compute_cluster_intent_shares, cluster_rows_mask
 from .lsi_converter import convert_query_lsi_phrases, convert_cluster_lsi_phrases
+from .all_queries_writer import DIAG_EXPORT
+
+
+def _print_frequency_diagnostics(df_export: pd.DataFrame):
+    """
+    Вывести число запросов с ненулевой частотой (включается SEO_DIAG=1)
+    
+    Args:
+        df_export: DataFrame для записи на лист
+    """
+    if 'frequency_world' in df_export.columns:
+        non_zero_freq_world = (df_export['frequency_world'] > 0).sum()
+        total_rows = len(df_export)
+        print(f"    ℹ️  Частота (мир): {non_zero_freq_world} из {total_rows} запросов с ненулевой частотой")
+        if non_zero_freq_world == 0 and total_rows > 0:
+            print(f"    ⚠️  ВНИМАНИЕ: Все частоты равны нулю! Проверьте данные в БД.")
+    
+    if 'frequency_exact' in df_export.columns:
+        non_zero_freq_exact = (df_export['frequency_exact'] > 0).sum()
+        total_rows = len(df_export)
+        print(f"    ℹ️  Частота (точная): {non_zero_freq_exact} из {total_rows} запросов с ненулевой частотой")
+
+
+def _cluster_rows(df: pd.DataFrame, is_selected: pd.Series, cluster_codes: Optional[np.ndarray]) -> np.ndarray:
+    """
+    Маска строк выбранных кластеров
+    
+    Args:
+        df: DataFrame с данными
+        is_selected: Булева маска с индексом ID кластера (по возрастанию)
+        cluster_codes: Коды кластеров строк df (factorize_clusters) или None
+        
+    Returns:
+        Булева маска строк df
+    """
+    # Коды кластеров согласованы с отсортированным индексом таблицы долей -
+    # маска строк получается индексацией, без хэширования ID (isin)
+    if cluster_codes is not None and len(cluster_codes) == len(df):
+        return cluster_rows_mask(cluster_codes, is_selected.to_numpy())
+    
+    return df['semantic_cluster_id'].isin(is_selected.index[is_selected]).to_numpy()
+
+
+def _selected_include_direct(intent_shares: Optional[pd.DataFrame], is_selected: pd.Series) -> Optional[bool]:
+    """
+    Выводить ли колонки Direct для выбранных кластеров (по таблице долей)
+    
+    Args:
+        intent_shares: Доли интентов по кластерам или None
+        is_selected: Булева маска с индексом ID кластера
+        
+    Returns:
+        True/False или None, если в таблице нет счетчиков Direct
+    """
+    if intent_shares is None or 'direct_shows_count' not in intent_shares.columns:
+        return None
+    
+    selected = intent_shares.loc[is_selected.index[is_selected]]
+    return bool((selected['direct_shows_count'] > 0).any() and (selected['frequency_exact_count'] > 0).any())
+
+
+def _build_export_frame(df_filtered: pd.DataFrame, include_direct: Optional[bool] = None) -> pd.DataFrame:
+    """
+    Собрать DataFrame для записи на лист из отфильтрованных строк
+    
+    Колонки выбираются без копии: замененные колонки (частота без NaN,
+    LSI фразы строками) подставляются через assign одним новым DataFrame.
+    
+    Args:
+        df_filtered: Отфильтрованный и отсортированный DataFrame
+        include_direct: Выводить колонки Direct (None - проверить данные df_filtered)
+        
+    Returns:
+        DataFrame с колонками для экспорта
+    """
+    columns_to_export = select_columns_for_export(df_filtered, include_direct)
+    replaced_columns = {}
+    
+    # Заменяем NaN на 0 в выгружаемой колонке частоты
+    if 'frequency_world' in columns_to_export:
+        replaced_columns['frequency_world'] = df_filtered['frequency_world'].fillna(0)
+    
+    # Конвертируем LSI фразы (проход по numpy-массиву без Series.apply)
+    if 'lsi_phrases' in columns_to_export:
+        replaced_columns['lsi_phrases'] = [
+            convert_query_lsi_phrases(x) for x in df_filtered['lsi_phrases'].to_numpy()
+        ]
+    
+    if 'cluster_lsi_phrases' in columns_to_export:
+        replaced_columns['cluster_lsi_phrases'] = [
+            convert_cluster_lsi_phrases(x) for x in df_filtered['cluster_lsi_phrases'].to_numpy()
+        ]
+    
+    df_export = df_filtered[columns_to_export].assign(**replaced_columns)
+    
+    # Диагностика частот перед экспортом (полные проходы по колонкам) - только при SEO_DIAG=1
+    if DIAG_EXPORT:
+        _print_frequency_diagnostics(df_export)
+    
+    return df_export
 
 
 def create_intent_filtered_sheet_impl(
@@ -15,7 +119,10 @@ def create_intent_filtered_sheet_impl(
     writer: pd.ExcelWriter,
     formats: dict,
     intent_type: str,
-    group_by_clusters: bool = True
+    group_by_clusters: bool = True,
+    presorted: bool = False,
+    intent_shares: Optional[pd.DataFrame] = None,
+    cluster_codes: Optional[np.ndarray] = None
 ):
     """
     Базовая реализация создания листа с фильтрацией по интенту
@@ -30,6 +137,9 @@ def create_intent_filtered_sheet_impl(
         formats: Словарь с форматами
         intent_type: Тип интента ('commercial' или 'informational')
         group_by_clusters: Группировать по кластерам
+        presorted: df уже отсортирован sort_for_export
+        intent_shares: Доли интентов по кластерам (compute_cluster_intent_shares)
+        cluster_codes: Коды кластеров строк df (factorize_clusters, те же, что для intent_shares)
     """
     # Названия листов
     sheet_names = {
@@ -44,111 +154,55 @@ def create_intent_filtered_sheet_impl(
         print(f"ℹ️  Пропускаем лист '{sheet_name}' - нет колонок semantic_cluster_id или main_intent")
         return
     
-    # Определяем какие интенты считаются коммерческими
-    commercial_intents = ['commercial', 'commercial_geo', 'transactional']
-    
     # Порог для классификации кластера (70%)
     threshold = 0.7
     
-    # Фильтруем кластеры по порогу 70%
-    filtered_cluster_ids = []
-    for cluster_id, cluster_df in df.groupby('semantic_cluster_id'):
-        total_count = len(cluster_df)
-        if total_count == 0:
-            continue
-        
-        if intent_type == 'commercial':
-            # Подсчитываем коммерческие запросы
-            commercial_count = cluster_df[cluster_df['main_intent'].isin(commercial_intents)].shape[0]
-            commercial_ratio = commercial_count / total_count
-            
-            # Кластер считается коммерческим, если >70% запросов коммерческие
-            if commercial_ratio > threshold:
-                filtered_cluster_ids.append(cluster_id)
-        elif intent_type == 'informational':
-            # Подсчитываем информационные запросы
-            informational_count = cluster_df[cluster_df['main_intent'] == 'informational'].shape[0]
-            informational_ratio = informational_count / total_count
-            
-            # Кластер считается информационным, если >70% запросов информационные
-            if informational_ratio > threshold:
-                filtered_cluster_ids.append(cluster_id)
-        else:
-            # Для других типов проверяем точное совпадение с порогом
-            matching_count = cluster_df[cluster_df['main_intent'] == intent_type].shape[0]
-            matching_ratio = matching_count / total_count
-            if matching_ratio > threshold:
-                filtered_cluster_ids.append(cluster_id)
-    
-    if not filtered_cluster_ids:
+    # Фильтруем кластеры по порогу 70% (доли интентов считаются одним groupby)
+    if intent_type in ('commercial', 'informational'):
+        if intent_shares is None:
+            intent_shares = compute_cluster_intent_shares(df)
+        intent_ratio = intent_shares[f'{intent_type}_ratio']
+    else:
+        # Для других типов проверяем точное совпадение с порогом
+        intent_ratio = (df['main_intent'] == intent_type).groupby(df['semantic_cluster_id']).mean()
+    
+    is_filtered = intent_ratio > threshold
+    filtered_cluster_ids = intent_ratio.index[is_filtered]
+    
+    if filtered_cluster_ids.empty:
         print(f"ℹ️  Пропускаем лист '{sheet_name}' - нет кластеров с >70% {intent_type} запросов")
         return
     
-    # Фильтруем DataFrame
-    df_filtered = df[df['semantic_cluster_id'].isin(filtered_cluster_ids)].copy()
+    # Фильтруем DataFrame одной маской (без копии - дальше только чтение)
+    df_filtered = df[_cluster_rows(df, is_filtered, cluster_codes)]
     
     if df_filtered.empty:
         print(f"ℹ️  Пропускаем лист '{sheet_name}' - нет данных после фильтрации")
         return
     
-    # Сортируем
-    if group_by_clusters and 'semantic_cluster_id' in df_filtered.columns:
-        # Проверяем наличие frequency_world перед сортировкой
-        if 'frequency_world' in df_filtered.columns:
-            df_filtered['frequency_world'] = df_filtered['frequency_world'].fillna(0)
-            df_filtered = df_filtered.sort_values(['semantic_cluster_id', 'frequency_world'], ascending=[True, False])
-        else:
-            df_filtered = df_filtered.sort_values('semantic_cluster_id', ascending=True)
-    else:
-        if 'frequency_world' in df_filtered.columns:
-            df_filtered['frequency_world'] = df_filtered['frequency_world'].fillna(0)
-            df_filtered = df_filtered.sort_values('frequency_world', ascending=False)
+    # Сортируем (если DataFrame не отсортирован заранее - фильтрация порядок сохраняет)
+    if not presorted:
+        df_filtered = sort_for_export(df_filtered, group_by_clusters)
     
-    # Выбираем колонки для экспорта
-    columns_to_export = select_columns_for_export(df_filtered)
-    df_export = df_filtered[columns_to_export].copy()
+    # Колонки для экспорта (частота без NaN, LSI фразы строками)
+    df_export = _build_export_frame(df_filtered, _selected_include_direct(intent_shares, is_filtered))
     
-    # Диагностика частот перед экспортом
-    if 'frequency_world' in df_export.columns:
-        non_zero_freq_world = (df_export['frequency_world'] > 0).sum()
-        total_rows = len(df_export)
-        print(f"    ℹ️  Частота (мир): {non_zero_freq_world} из {total_rows} запросов с ненулевой частотой")
-        if non_zero_freq_world == 0 and total_rows > 0:
-            print(f"    ⚠️  ВНИМАНИЕ: Все частоты равны нулю! Проверьте данные в БД.")
+    worksheet = writer.book.add_worksheet(sheet_name)
     
-    if 'frequency_exact' in df_export.columns:
-        non_zero_freq_exact = (df_export['frequency_exact'] > 0).sum()
-        total_rows = len(df_export)
-        print(f"    ℹ️  Частота (точная): {non_zero_freq_exact} из {total_rows} запросов с ненулевой частотой")
-    
-    # Конвертируем LSI фразы
-    if 'lsi_phrases' in df_export.columns:
-        df_export['lsi_phrases'] = df_export['lsi_phrases'].apply(convert_query_lsi_phrases)
-    
-    if 'cluster_lsi_phrases' in df_export.columns:
-        df_export['cluster_lsi_phrases'] = df_export['cluster_lsi_phrases'].apply(convert_cluster_lsi_phrases)
-    
-    # Записываем в Excel
-    df_export.to_excel(writer, sheet_name=sheet_name, index=False, startrow=1, header=False)
+    # Заголовки (с переводом на русский), ширина, форматы чисел и условное
+    # форматирование - до данных: в режиме constant_memory строки пишутся по порядку
+    write_column_specs(worksheet, build_column_spec(df_export), formats, len(df_export))
     
-    worksheet = writer.sheets[sheet_name]
-    
-    # Записываем заголовки с переводом на русский
-    for col_num, col_name in enumerate(df_export.columns):
-        russian_name = get_column_translation(col_name)
-        worksheet.write(0, col_num, russian_name, formats['header'])
+    # Записываем данные построчно
+    write_dataframe_rows(worksheet, df_export, start_row=1)
     
     # Настройки листа
     worksheet.freeze_panes(1, 0)
-    worksheet.autofilter(0, 0, len(df_export), len(df_export.columns) - 1)
-    
-    # Форматирование
-    set_column_widths(worksheet, df_export.columns)
-    apply_number_formats(worksheet, df_export, formats)
-    add_conditional_formatting(worksheet, df_export, sheet_name)
+    if len(df_export) >= MIN_ROWS_FOR_FILTERS:
+        worksheet.autofilter(0, 0, len(df_export), len(df_export.columns) - 1)
     
     # Статистика
-    clusters_count = df_filtered['semantic_cluster_id'].nunique() if 'semantic_cluster_id' in df_filtered.columns else 0
+    clusters_count = len(filtered_cluster_ids)
     print(f"  ✓ Создан лист '{sheet_name}': {clusters_count} кластеров, {len(df_export)} запросов")
 
 
@@ -168,8 +222,13 @@ def create_intent_summary_sheet_impl(df: pd.DataFrame, writer: pd.ExcelWriter, f
         print(f"ℹ️  Пропускаем лист '{sheet_name}' - нет колонки main_intent")
         return
     
-    # Группируем по интентам
-    intent_stats = df.groupby('main_intent').agg({
+    # Нет ни одного интента - группировать нечего
+    if not df['main_intent'].notna().any():
+        print(f"ℹ️  Пропускаем лист '{sheet_name}' - интенты не определены")
+        return
+    
+    # Группируем по интентам (observed=True: для category - только встречающиеся интенты)
+    intent_stats = df.groupby('main_intent', observed=True).agg({
         'keyword': 'count',
         'frequency_world': 'sum'
     }).reset_index()
@@ -177,10 +236,10 @@ def create_intent_summary_sheet_impl(df: pd.DataFrame, writer: pd.ExcelWriter, f
     intent_stats.columns = ['Интент', 'Количество запросов', 'Суммарная частота']
     intent_stats = intent_stats.sort_values('Суммарная частота', ascending=False)
     
-    # Записываем
-    intent_stats.to_excel(writer, sheet_name=sheet_name, index=False)
-    
-    worksheet = writer.sheets[sheet_name]
+    # Записываем (заголовок, затем строки - совместимо с constant_memory)
+    worksheet = writer.book.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, list(intent_stats.columns), formats['header'])
+    write_dataframe_rows(worksheet, intent_stats, start_row=1)
     worksheet.freeze_panes(1, 0)
     
     # Форматирование
@@ -197,7 +256,10 @@ def create_mixed_intent_sheet_impl(
     formats: dict,
     group_by_clusters: bool = True,
     min_mixed_ratio: float = 0.3,
-    max_mixed_ratio: float = 0.7
+    max_mixed_ratio: float = 0.7,
+    presorted: bool = False,
+    intent_shares: Optional[pd.DataFrame] = None,
+    cluster_codes: Optional[np.ndarray] = None
 ):
     """
     Создает лист со смешанными кластерами (где есть и коммерческие, и информационные запросы)
@@ -217,6 +279,9 @@ def create_mixed_intent_sheet_impl(
         group_by_clusters: Группировать по кластерам
         min_mixed_ratio: Минимальное соотношение коммерческих (по умолчанию 0.3 = 30%)
         max_mixed_ratio: Максимальное соотношение коммерческих (по умолчанию 0.7 = 70%)
+        presorted: df уже отсортирован sort_for_export
+        intent_shares: Доли интентов по кластерам (compute_cluster_intent_shares)
+        cluster_codes: Коды кластеров строк df (factorize_clusters, те же, что для intent_shares)
     """
     sheet_name = 'Смешанные'
     
@@ -225,106 +290,58 @@ def create_mixed_intent_sheet_impl(
         print(f"ℹ️  Пропускаем лист '{sheet_name}' - нет колонок semantic_cluster_id или main_intent")
         return
     
-    # Определяем какие интенты считаются коммерческими
-    commercial_intents = ['commercial', 'commercial_geo', 'transactional']
-    
     # Порог для классификации (70%)
     threshold = 0.7
     
+    if intent_shares is None:
+        intent_shares = compute_cluster_intent_shares(df)
+    
+    commercial_ratio = intent_shares['commercial_ratio']
+    informational_ratio = intent_shares['informational_ratio']
+    
     # Находим смешанные кластеры
-    # Смешанные = не коммерческие (>70%) и не информационные (>70%)
-    mixed_cluster_ids = []
-    for cluster_id, cluster_df in df.groupby('semantic_cluster_id'):
-        total_count = len(cluster_df)
-        if total_count == 0:
-            continue
-        
-        # Подсчитываем коммерческие и информационные запросы
-        commercial_count = cluster_df[cluster_df['main_intent'].isin(commercial_intents)].shape[0]
-        informational_count = cluster_df[cluster_df['main_intent'] == 'informational'].shape[0]
-        
-        # Пропускаем кластеры где нет смешения (только один тип интента)
-        if commercial_count == 0 or informational_count == 0:
-            continue
-        
-        # Вычисляем соотношение коммерческих запросов
-        commercial_ratio = commercial_count / total_count
-        informational_ratio = informational_count / total_count
-        
-        # Кластер считается смешанным, если:
-        # - коммерческих запросов <= 70% И
-        # - информационных запросов <= 70% И
-        # - соотношение коммерческих в диапазоне [min_mixed_ratio, max_mixed_ratio]
-        if commercial_ratio <= threshold and informational_ratio <= threshold:
-            if min_mixed_ratio <= commercial_ratio <= max_mixed_ratio:
-                mixed_cluster_ids.append(cluster_id)
-    
-    if not mixed_cluster_ids:
+    # Смешанные = есть оба типа интента, коммерческих и информационных <= 70%
+    # и соотношение коммерческих в диапазоне [min_mixed_ratio, max_mixed_ratio]
+    is_mixed = (
+        (intent_shares['commercial_count'] > 0)
+        & (intent_shares['informational_count'] > 0)
+        & (commercial_ratio <= threshold)
+        & (informational_ratio <= threshold)
+        & commercial_ratio.between(min_mixed_ratio, max_mixed_ratio)
+    )
+    mixed_cluster_ids = intent_shares.index[is_mixed]
+    
+    if mixed_cluster_ids.empty:
         print(f"ℹ️  Пропускаем лист '{sheet_name}' - нет смешанных кластеров")
         return
     
-    # Фильтруем DataFrame - только смешанные кластеры
-    df_filtered = df[df['semantic_cluster_id'].isin(mixed_cluster_ids)].copy()
+    # Фильтруем DataFrame - только смешанные кластеры (без копии - дальше только чтение)
+    df_filtered = df[_cluster_rows(df, is_mixed, cluster_codes)]
     
     if df_filtered.empty:
         print(f"ℹ️  Пропускаем лист '{sheet_name}' - нет данных после фильтрации")
         return
     
-    # Сортируем
-    if group_by_clusters and 'semantic_cluster_id' in df_filtered.columns:
-        # Проверяем наличие frequency_world перед сортировкой
-        if 'frequency_world' in df_filtered.columns:
-            df_filtered['frequency_world'] = df_filtered['frequency_world'].fillna(0)
-            df_filtered = df_filtered.sort_values(['semantic_cluster_id', 'frequency_world'], ascending=[True, False])
-        else:
-            df_filtered = df_filtered.sort_values('semantic_cluster_id', ascending=True)
-    else:
-        if 'frequency_world' in df_filtered.columns:
-            df_filtered['frequency_world'] = df_filtered['frequency_world'].fillna(0)
-            df_filtered = df_filtered.sort_values('frequency_world', ascending=False)
-    
-    # Выбираем колонки для экспорта
-    columns_to_export = select_columns_for_export(df_filtered)
-    df_export = df_filtered[columns_to_export].copy()
-    
-    # Диагностика частот перед экспортом
-    if 'frequency_world' in df_export.columns:
-        non_zero_freq_world = (df_export['frequency_world'] > 0).sum()
-        total_rows = len(df_export)
-        print(f"    ℹ️  Частота (мир): {non_zero_freq_world} из {total_rows} запросов с ненулевой частотой")
-        if non_zero_freq_world == 0 and total_rows > 0:
-            print(f"    ⚠️  ВНИМАНИЕ: Все частоты равны нулю! Проверьте данные в БД.")
-    
-    if 'frequency_exact' in df_export.columns:
-        non_zero_freq_exact = (df_export['frequency_exact'] > 0).sum()
-        total_rows = len(df_export)
-        print(f"    ℹ️  Частота (точная): {non_zero_freq_exact} из {total_rows} запросов с ненулевой частотой")
-    
-    # Конвертируем LSI фразы
-    if 'lsi_phrases' in df_export.columns:
-        df_export['lsi_phrases'] = df_export['lsi_phrases'].apply(convert_query_lsi_phrases)
+    # Сортируем (если DataFrame не отсортирован заранее - фильтрация порядок сохраняет)
+    if not presorted:
+        df_filtered = sort_for_export(df_filtered, group_by_clusters)
     
-    if 'cluster_lsi_phrases' in df_export.columns:
-        df_export['cluster_lsi_phrases'] = df_export['cluster_lsi_phrases'].apply(convert_cluster_lsi_phrases)
+    # Колонки для экспорта (частота без NaN, LSI фразы строками)
+    df_export = _build_export_frame(df_filtered, _selected_include_direct(intent_shares, is_mixed))
     
-    # Записываем в Excel
-    df_export.to_excel(writer, sheet_name=sheet_name, index=False, startrow=1, header=False)
+    worksheet = writer.book.add_worksheet(sheet_name)
     
-    worksheet = writer.sheets[sheet_name]
+    # Заголовки (с переводом на русский), ширина, форматы чисел и условное
+    # форматирование - до данных: в режиме constant_memory строки пишутся по порядку
+    write_column_specs(worksheet, build_column_spec(df_export), formats, len(df_export))
     
-    # Записываем заголовки с переводом на русский
-    for col_num, col_name in enumerate(df_export.columns):
-        russian_name = get_column_translation(col_name)
-        worksheet.write(0, col_num, russian_name, formats['header'])
+    # Записываем данные построчно
+    write_dataframe_rows(worksheet, df_export, start_row=1)
     
     # Настройки листа
     worksheet.freeze_panes(1, 0)
-    worksheet.autofilter(0, 0, len(df_export), len(df_export.columns) - 1)
-    
-    # Форматирование
-    set_column_widths(worksheet, df_export.columns)
-    apply_number_formats(worksheet, df_export, formats)
-    add_conditional_formatting(worksheet, df_export, sheet_name)
+    if len(df_export) >= MIN_ROWS_FOR_FILTERS:
+        worksheet.autofilter(0, 0, len(df_export), len(df_export.columns) - 1)
     
     # Статистика
     clusters_count = len(mixed_cluster_ids)
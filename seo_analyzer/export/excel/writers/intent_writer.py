@@ -2,9 +2,8 @@
 Создание листов с интентами
 """
 
-import sys
-import importlib.util
-from pathlib import Path
+from typing import Optional
+import numpy as np
 import pandas as pd
 
 from .intent_filter_impl import (
@@ -23,15 +22,6 @@ def create_intent_summary_sheet(df: pd.DataFrame, writer: pd.ExcelWriter, format
         writer: ExcelWriter объект
         formats: Словарь с форматами
     """
-    backup_path = Path(__file__).parent.parent / 'data_writer.py.backup'
-    if backup_path.exists():
-        spec = importlib.util.spec_from_file_location("data_writer_backup", str(backup_path))
-        if spec is not None and spec.loader is not None:
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            return module.create_intent_summary_sheet(df, writer, formats)
-    
-    # Fallback: используем базовую реализацию
     return _create_intent_summary_sheet_impl(df, writer, formats)
 
 
@@ -40,7 +30,10 @@ def create_intent_filtered_sheet(
     writer: pd.ExcelWriter,
     formats: dict,
     intent_type: str,
-    group_by_clusters: bool = True
+    group_by_clusters: bool = True,
+    presorted: bool = False,
+    intent_shares: Optional[pd.DataFrame] = None,
+    cluster_codes: Optional[np.ndarray] = None
 ):
     """
     Создать отфильтрованный лист по интенту
@@ -51,17 +44,13 @@ def create_intent_filtered_sheet(
         formats: Словарь с форматами
         intent_type: Тип интента для фильтрации
         group_by_clusters: Группировать по кластерам
+        presorted: df уже отсортирован sort_for_export
+        intent_shares: Доли интентов по кластерам (считаются, если не переданы)
+        cluster_codes: Коды кластеров строк df (factorize_clusters, те же, что для intent_shares)
     """
-    backup_path = Path(__file__).parent.parent / 'data_writer.py.backup'
-    if backup_path.exists():
-        spec = importlib.util.spec_from_file_location("data_writer_backup", str(backup_path))
-        if spec is not None and spec.loader is not None:
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            return module.create_intent_filtered_sheet(df, writer, formats, intent_type, group_by_clusters)
-    
-    # Fallback: используем базовую реализацию
-    return _create_intent_filtered_sheet_impl(df, writer, formats, intent_type, group_by_clusters)
+    return _create_intent_filtered_sheet_impl(
+        df, writer, formats, intent_type, group_by_clusters, presorted, intent_shares, cluster_codes
+    )
 
 
 def create_mixed_intent_sheet(
@@ -70,7 +59,10 @@ def create_mixed_intent_sheet(
     formats: dict,
     group_by_clusters: bool = True,
     min_mixed_ratio: float = 0.3,
-    max_mixed_ratio: float = 0.7
+    max_mixed_ratio: float = 0.7,
+    presorted: bool = False,
+    intent_shares: Optional[pd.DataFrame] = None,
+    cluster_codes: Optional[np.ndarray] = None
 ):
     """
     Создать лист со смешанными кластерами
@@ -82,6 +74,12 @@ def create_mixed_intent_sheet(
         group_by_clusters: Группировать по кластерам
         min_mixed_ratio: Минимальное соотношение коммерческих запросов (по умолчанию 0.3)
         max_mixed_ratio: Максимальное соотношение коммерческих запросов (по умолчанию 0.7)
+        presorted: df уже отсортирован sort_for_export
+        intent_shares: Доли интентов по кластерам (считаются, если не переданы)
+        cluster_codes: Коды кластеров строк df (factorize_clusters, те же, что для intent_shares)
     """
-    return _create_mixed_intent_sheet_impl(df, writer, formats, group_by_clusters, min_mixed_ratio, max_mixed_ratio)
+    return _create_mixed_intent_sheet_impl(
+        df, writer, formats, group_by_clusters, min_mixed_ratio, max_mixed_ratio, presorted, intent_shares,
+        cluster_codes
+    )
 
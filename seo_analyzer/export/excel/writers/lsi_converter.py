@@ -6,13 +6,67 @@ import json
 import numpy as np
 
 
+# Сколько фраз выводится в ячейку
+MAX_LSI_PHRASES = 20
+
+# Символы, с которых может начинаться JSON-значение: строки с другим первым
+# символом json.loads заведомо не разберет - возвращаем их без попытки парсинга
+JSON_START_CHARS = frozenset('[{"-0123456789tfnNI')
+
+
+def _join_phrases(items) -> str:
+    """
+    Собрать фразы (строки или словари с ключом 'phrase') в одну строку
+    
+    Args:
+        items: Список фраз
+    
+    Returns:
+        Строка с фразами через запятую (не больше MAX_LSI_PHRASES)
+    """
+    phrases = []
+    for item in items[:MAX_LSI_PHRASES]:
+        # Строки - самый частый случай (список из JSON), проверяем первыми
+        if isinstance(item, str):
+            phrase = item.strip()
+            if phrase:
+                phrases.append(phrase)
+        elif isinstance(item, dict):
+            phrase = item.get('phrase', '')
+            if phrase:
+                phrases.append(phrase)
+    return ', '.join(phrases)
+
+
+def _parse_phrases_json(x: str, stripped: str) -> str:
+    """
+    Разобрать строку JSON со списком фраз
+    
+    Args:
+        x: Исходная строка
+        stripped: Строка без пробелов по краям (не пустая)
+    
+    Returns:
+        Строка с фразами; исходная строка, если это не JSON; '' если JSON - не список
+    """
+    if stripped[0] not in JSON_START_CHARS:
+        return x
+    try:
+        parsed = json.loads(x)
+        if isinstance(parsed, list):
+            return _join_phrases(parsed)
+    except (json.JSONDecodeError, TypeError):
+        return x
+    return ''
+
+
 def convert_query_lsi_phrases(x):
     """
     Конвертировать LSI фразы запроса в строку для Excel
     
     Args:
         x: LSI фразы (список, строка JSON или None)
-        
+    
     Returns:
         Строка с фразами через запятую
     """
@@ -20,36 +74,12 @@ def convert_query_lsi_phrases(x):
         return ''
     
     if isinstance(x, (list, tuple, np.ndarray)):
-        if len(x) == 0:
-            return ''
-        phrases = []
-        for item in x[:20]:  # Топ-20 фраз
-            if isinstance(item, dict):
-                phrase = item.get('phrase', '')
-                if phrase:
-                    phrases.append(phrase)
-            elif isinstance(item, str):
-                if item.strip():
-                    phrases.append(item.strip())
-        return ', '.join(phrases) if phrases else ''
+        return _join_phrases(x)
     elif isinstance(x, str):
-        if x.strip() == '' or x.strip() == '[]':
+        stripped = x.strip()
+        if stripped == '' or stripped == '[]':
             return ''
-        try:
-            parsed = json.loads(x)
-            if isinstance(parsed, list):
-                phrases = []
-                for item in parsed[:20]:
-                    if isinstance(item, dict):
-                        phrase = item.get('phrase', '')
-                        if phrase:
-                            phrases.append(phrase)
-                    elif isinstance(item, str):
-                        if item.strip():
-                            phrases.append(item.strip())
-                return ', '.join(phrases) if phrases else ''
-        except (json.JSONDecodeError, TypeError):
-            return x
+        return _parse_phrases_json(x, stripped)
     return ''
 
 
@@ -59,7 +89,7 @@ def convert_cluster_lsi_phrases(x):
     
     Args:
         x: LSI фразы (список, строка JSON или None)
-        
+    
     Returns:
         Строка с фразами через запятую
     """
@@ -67,44 +97,14 @@ def convert_cluster_lsi_phrases(x):
         return ''
     
     if isinstance(x, (list, tuple, np.ndarray)):
-        if len(x) == 0:
-            return ''
-        phrases = []
-        for item in x[:20]:  # Топ-20 фраз
-            if isinstance(item, dict):
-                phrase = item.get('phrase', '')
-                if phrase:
-                    phrases.append(phrase)
-            elif isinstance(item, str):
-                if item.strip():
-                    phrases.append(item.strip())
-        return ', '.join(phrases) if phrases else ''
+        return _join_phrases(x)
     elif isinstance(x, str):
-        if x.strip() == '' or x.strip() == '[]':
+        stripped = x.strip()
+        if stripped == '' or stripped == '[]':
             return ''
         # Если это уже готовая строка с фразами - возвращаем как есть
         if ',' in x or len(x) > 50:
             return x
         # Иначе пытаемся распарсить как JSON
-        try:
-            parsed = json.loads(x)
-            if isinstance(parsed, list):
-                phrases = []
-                for item in parsed[:20]:
-                    if isinstance(item, dict):
-                        phrase = item.get('phrase', '')
-                        if phrase:
-                            phrases.append(phrase)
-                    elif isinstance(item, str):
-                        if item.strip():
-                            phrases.append(item.strip())
-                return ', '.join(phrases) if phrases else ''
-        except (json.JSONDecodeError, TypeError):
-            return x
+        return _parse_phrases_json(x, stripped)
     return ''
-
-
-
-
-
-
@@ -1,8 +1,74 @@
 """Экспорт графов в GraphML и GEXF"""
 
+import csv
+import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Tuple
 import networkx as nx
+import numpy as np
+
+
+# Размер буфера записи списка ребер
+EDGE_LIST_BUFFER_SIZE = 1 << 20
+
+# Отметка "атрибута у узла не было" при восстановлении атрибутов
+_MISSING = object()
+
+
+@contextmanager
+def _temporary_node_attributes(
+    graph: nx.Graph,
+    name: str,
+    values: Iterable[Tuple]
+) -> Iterator[None]:
+    """
+    Временно задать атрибут узлам графа (на время записи файла)
+    
+    После выхода прежние значения восстанавливаются, добавленные атрибуты
+    удаляются - граф вызывающего кода не меняется и не копируется.
+    
+    Args:
+        graph: Граф NetworkX
+        name: Название атрибута
+        values: Пары (узел, значение); узлы не из графа пропускаются
+    """
+    node_attributes = graph.nodes
+    saved = []
+    try:
+        for node, value in values:
+            if node not in node_attributes:
+                continue
+            data = node_attributes[node]
+            saved.append((data, data.get(name, _MISSING)))
+            data[name] = value
+        yield
+    finally:
+        for data, old_value in reversed(saved):
+            if old_value is _MISSING:
+                del data[name]
+            else:
+                data[name] = old_value
+
+
+@contextmanager
+def _export_node_attributes(
+    graph: nx.Graph,
+    communities: Optional[dict],
+    pagerank: Optional[dict]
+) -> Iterator[None]:
+    """
+    Атрибуты узлов для экспорта (сообщество, PageRank, степень) на время записи
+    
+    Args:
+        graph: Граф NetworkX
+        communities: Словарь {node_id: community_id}
+        pagerank: Словарь {node_id: pagerank_score}
+    """
+    with _temporary_node_attributes(graph, 'community', communities.items() if communities else ()), \
+            _temporary_node_attributes(graph, 'pagerank', pagerank.items() if pagerank else ()), \
+            _temporary_node_attributes(graph, 'degree', graph.degree()):
+        yield
 
 
 class GraphExporter:
@@ -34,19 +100,10 @@ class GraphExporter:
         try:
             print(f"💾 Экспорт в GraphML: {output_path.name}...")
             
-            # Добавляем атрибуты узлам
-            if communities:
-                nx.set_node_attributes(graph, communities, 'community')
-            
-            if pagerank:
-                nx.set_node_attributes(graph, pagerank, 'pagerank')
-            
-            # Добавляем степень узлов
-            degrees = dict(graph.degree())
-            nx.set_node_attributes(graph, degrees, 'degree')
-            
-            # Сохраняем
-            nx.write_graphml(graph, output_path)
+            # Атрибуты узлов (сообщество, PageRank, степень) задаются только на время
+            # записи - граф вызывающего кода остается без изменений
+            with _export_node_attributes(graph, communities, pagerank):
+                nx.write_graphml(graph, output_path)
             
             print(f"✓ GraphML экспортирован: {graph.number_of_nodes()} узлов, {graph.number_of_edges()} ребер")
             return True
@@ -77,19 +134,10 @@ class GraphExporter:
         try:
             print(f"💾 Экспорт в GEXF: {output_path.name}...")
             
-            # Добавляем атрибуты
-            if communities:
-                nx.set_node_attributes(graph, communities, 'community')
-            
-            if pagerank:
-                nx.set_node_attributes(graph, pagerank, 'pagerank')
-            
-            # Добавляем степень
-            degrees = dict(graph.degree())
-            nx.set_node_attributes(graph, degrees, 'degree')
-            
-            # Сохраняем
-            nx.write_gexf(graph, output_path)
+            # Атрибуты узлов (сообщество, PageRank, степень) задаются только на время
+            # записи - граф вызывающего кода остается без изменений
+            with _export_node_attributes(graph, communities, pagerank):
+                nx.write_gexf(graph, output_path)
             
             print(f"✓ GEXF экспортирован")
             return True
@@ -116,7 +164,14 @@ class GraphExporter:
         try:
             print(f"💾 Экспорт списка ребер: {output_path.name}...")
             
-            nx.write_edgelist(graph, output_path, data=['weight'])
+            # Прямая запись строк (как nx.write_edgelist(data=['weight'])): "u v weight",
+            # для ребра без веса - "u v"; запись буферизуется крупными блоками
+            with open(output_path, 'w', encoding='utf-8', newline='\n', buffering=EDGE_LIST_BUFFER_SIZE) as f:
+                for u, v, weight in graph.edges(data='weight', default=_MISSING):
+                    if weight is _MISSING:
+                        f.write(f"{u} {v}\n")
+                    else:
+                        f.write(f"{u} {v} {weight}\n")
             
             print(f"✓ Список ребер экспортирован")
             return True
@@ -143,21 +198,35 @@ class GraphExporter:
         try:
             print(f"💾 Экспорт матрицы смежности: {output_path.name}...")
             
-            import pandas as pd
-            
-            # Получаем матрицу смежности
-            adj_matrix = nx.adjacency_matrix(graph)
+            if graph.number_of_nodes() == 0:
+                raise nx.NetworkXError("Graph has no nodes or edges")
             
-            # Конвертируем в DataFrame
+            # Матрица пишется построчно из списков смежности: в памяти одна строка (N),
+            # а не плотная матрица N x N и DataFrame поверх нее.
+            # Значения - как у nx.adjacency_matrix: сумма весов ребер (weight, по умолчанию 1),
+            # петля неориентированного графа - один раз; целые веса пишутся как int
             node_list = list(graph.nodes())
-            df = pd.DataFrame(
-                adj_matrix.toarray(),
-                index=node_list,
-                columns=node_list
-            )
+            node_index = {node: idx for idx, node in enumerate(node_list)}
             
-            # Сохраняем
-            df.to_csv(output_path)
+            is_integer = graph.number_of_edges() > 0 and all(
+                isinstance(weight, (int, np.integer))
+                for _, _, weight in graph.edges(data='weight', default=1)
+            )
+            zero_cell = '0' if is_integer else '0.0'
+            
+            with open(output_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f, lineterminator=os.linesep)
+                writer.writerow([''] + node_list)
+                
+                for node in node_list:
+                    row = [zero_cell] * len(node_list)
+                    for neighbor, edge_data in graph.adj[node].items():
+                        if graph.is_multigraph():
+                            weight = sum(data.get('weight', 1) for data in edge_data.values())
+                        else:
+                            weight = edge_data.get('weight', 1)
+                        row[node_index[neighbor]] = str(int(weight) if is_integer else float(weight))
+                    writer.writerow([node] + row)
             
             print(f"✓ Матрица смежности экспортирована")
             return True
@@ -3,11 +3,17 @@
 from .dashboard_builder import build_dashboard
 from .stats_collector import collect_stats, collect_clusters_data
 from .style_manager import get_css_styles
-from .template_engine import get_javascript, generate_html_template
+from .template_engine import (
+    get_javascript,
+    generate_html_template,
+    generate_html_head,
+    generate_html_tail
+)
 from .section_generator import (
     generate_intent_section,
     generate_funnel_section,
-    generate_clusters_section
+    generate_clusters_section,
+    iter_clusters_section
 )
 
 __all__ = [
@@ -17,8 +23,11 @@ __all__ = [
     'get_css_styles',
     'get_javascript',
     'generate_html_template',
+    'generate_html_head',
+    'generate_html_tail',
     'generate_intent_section',
     'generate_funnel_section',
     'generate_clusters_section',
+    'iter_clusters_section',
 ]
 
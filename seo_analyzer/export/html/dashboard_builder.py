@@ -6,14 +6,18 @@ import pandas as pd
 
 from .stats_collector import collect_stats, collect_clusters_data
 from .style_manager import get_css_styles
-from .template_engine import get_javascript, generate_html_template
+from .template_engine import get_javascript, generate_html_head, generate_html_tail
 from .section_generator import (
     generate_intent_section,
     generate_funnel_section,
-    generate_clusters_section
+    iter_clusters_section
 )
 
 
+# Размер буфера записи HTML дашборда
+DASHBOARD_BUFFER_SIZE = 1 << 20
+
+
 def build_dashboard(
     df: pd.DataFrame,
     output_path: Path,
@@ -43,25 +47,17 @@ def build_dashboard(
         # Генерируем секции
         intent_section = generate_intent_section(stats)
         funnel_section = generate_funnel_section(stats)
-        clusters_section = generate_clusters_section(clusters_data)
         
         # Получаем стили и скрипты
         css_styles = get_css_styles()
         javascript = get_javascript()
         
-        # Генерируем HTML
-        html = generate_html_template(
-            stats=stats,
-            intent_section=intent_section,
-            funnel_section=funnel_section,
-            clusters_section=clusters_section,
-            css_styles=css_styles,
-            javascript=javascript
-        )
-        
-        # Сохраняем
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+        # Сохраняем: секция кластеров (основной объем HTML) пишется в файл
+        # по фрагментам, без сборки всего документа в одну строку
+        with open(output_path, 'w', encoding='utf-8', buffering=DASHBOARD_BUFFER_SIZE) as f:
+            f.write(generate_html_head(stats, intent_section, funnel_section, css_styles))
+            f.writelines(iter_clusters_section(clusters_data))
+            f.write(generate_html_tail(javascript))
         
         print(f"✓ HTML дашборд создан: {output_path}")
         return True
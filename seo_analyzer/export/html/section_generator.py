@@ -1,6 +1,29 @@
 """Генерация HTML секций для дашборда"""
 
-from typing import Dict, List
+from html import escape
+from typing import Dict, Iterator, List
+
+
+# Названия интентов и этапов воронки для дашборда
+INTENT_NAMES = {
+    'commercial': 'Коммерческий',
+    'informational': 'Информационный',
+    'navigational': 'Навигационный',
+    'transactional': 'Транзакционный'
+}
+
+FUNNEL_NAMES = {
+    'Awareness': 'Осведомленность',
+    'Interest': 'Интерес',
+    'Consideration': 'Рассмотрение',
+    'Decision': 'Решение',
+    'Purchase': 'Покупка'
+}
+
+FUNNEL_ORDER = ('Awareness', 'Interest', 'Consideration', 'Decision', 'Purchase')
+
+# Подпись для неизвестного интента или этапа воронки
+UNKNOWN_LABEL = 'Неизвестно'
 
 
 def generate_intent_section(stats: Dict) -> str:
@@ -16,21 +39,14 @@ def generate_intent_section(stats: Dict) -> str:
     if 'intent_dist' not in stats:
         return ""
     
-    intent_names = {
-        'commercial': 'Коммерческий',
-        'informational': 'Информационный',
-        'navigational': 'Навигационный',
-        'transactional': 'Транзакционный'
-    }
-    
     total = sum(stats['intent_dist'].values())
     
-    html = '<div class="section"><h2 class="section-title">Распределение по интентам</h2><div class="distribution">'
+    parts = ['<div class="section"><h2 class="section-title">Распределение по интентам</h2><div class="distribution">']
     
     for intent, count in sorted(stats['intent_dist'].items(), key=lambda x: x[1], reverse=True):
         percent = (count / total) * 100 if total > 0 else 0
-        name = intent_names.get(intent, intent)
-        html += f'''
+        name = escape(str(INTENT_NAMES.get(intent, intent)))
+        parts.append(f'''
             <div class="dist-item">
                 <div class="dist-label">{name}</div>
                 <div class="dist-bar">
@@ -39,10 +55,10 @@ def generate_intent_section(stats: Dict) -> str:
                     </div>
                 </div>
             </div>
-            '''
+            ''')
     
-    html += '</div></div>'
-    return html
+    parts.append('</div></div>')
+    return ''.join(parts)
 
 
 def generate_funnel_section(stats: Dict) -> str:
@@ -58,25 +74,16 @@ def generate_funnel_section(stats: Dict) -> str:
     if 'funnel_dist' not in stats:
         return ""
     
-    funnel_names = {
-        'Awareness': 'Осведомленность',
-        'Interest': 'Интерес',
-        'Consideration': 'Рассмотрение',
-        'Decision': 'Решение',
-        'Purchase': 'Покупка'
-    }
-    
-    funnel_order = ['Awareness', 'Interest', 'Consideration', 'Decision', 'Purchase']
     total = sum(stats['funnel_dist'].values())
     
-    html = '<div class="section"><h2 class="section-title">Распределение по воронке продаж</h2><div class="distribution">'
+    parts = ['<div class="section"><h2 class="section-title">Распределение по воронке продаж</h2><div class="distribution">']
     
-    for stage in funnel_order:
+    for stage in FUNNEL_ORDER:
         if stage in stats['funnel_dist']:
             count = stats['funnel_dist'][stage]
             percent = (count / total) * 100 if total > 0 else 0
-            name = funnel_names.get(stage, stage)
-            html += f'''
+            name = escape(str(FUNNEL_NAMES.get(stage, stage)))
+            parts.append(f'''
                 <div class="dist-item">
                     <div class="dist-label">{name}</div>
                     <div class="dist-bar">
@@ -85,54 +92,39 @@ def generate_funnel_section(stats: Dict) -> str:
                         </div>
                     </div>
                 </div>
-                '''
+                ''')
     
-    html += '</div></div>'
-    return html
+    parts.append('</div></div>')
+    return ''.join(parts)
 
 
-def generate_clusters_section(clusters_data: List[Dict]) -> str:
+def iter_clusters_section(clusters_data: List[Dict]) -> Iterator[str]:
     """
-    Генерирует секцию кластеров
+    Генерирует секцию кластеров по фрагментам (для записи в файл потоком)
     
     Args:
         clusters_data: Список словарей с данными кластеров
         
-    Returns:
-        HTML код секции кластеров
+    Yields:
+        Фрагменты HTML кода секции кластеров
     """
     if not clusters_data:
-        return ""
+        return
     
-    intent_names = {
-        'commercial': 'Коммерческий',
-        'informational': 'Информационный',
-        'navigational': 'Навигационный',
-        'transactional': 'Транзакционный',
-        'unknown': 'Неизвестно'
-    }
-    
-    funnel_names = {
-        'Awareness': 'Осведомленность',
-        'Interest': 'Интерес',
-        'Consideration': 'Рассмотрение',
-        'Decision': 'Решение',
-        'Purchase': 'Покупка',
-        'unknown': 'Неизвестно'
-    }
-    
-    html = '<div class="section">'
-    html += '<h2 class="section-title">Сформированные группы запросов</h2>'
-    html += '<input type="text" class="search-box" id="clusterSearch" onkeyup="searchClusters()" placeholder="🔍 Поиск по группам и запросам...">'
+    yield '<div class="section">'
+    yield '<h2 class="section-title">Сформированные группы запросов</h2>'
+    yield '<input type="text" class="search-box" id="clusterSearch" onkeyup="searchClusters()" placeholder="🔍 Поиск по группам и запросам...">'
     
+    # Название, URL и запросы - пользовательские данные: экранируются перед вставкой в HTML
+    # (html.escape на кириллице заметно быстрее str.translate с таблицей замен)
     for cluster in clusters_data:
-        intent_label = intent_names.get(cluster.get('main_intent', 'unknown'), 'Неизвестно')
-        funnel_label = funnel_names.get(cluster.get('funnel_stage', 'unknown'), 'Неизвестно')
+        intent_label = INTENT_NAMES.get(cluster.get('main_intent'), UNKNOWN_LABEL)
+        funnel_label = FUNNEL_NAMES.get(cluster.get('funnel_stage'), UNKNOWN_LABEL)
         
-        html += f'''
+        yield f'''
             <div class="cluster-card">
                 <div class="cluster-header">
-                    <div class="cluster-name">📁 {cluster['name']}</div>
+                    <div class="cluster-name">📁 {escape(str(cluster['name']))}</div>
                     <div class="cluster-stats">
                         <div class="cluster-stat">
                             <div class="cluster-stat-value">{cluster['size']}</div>
@@ -151,30 +143,41 @@ def generate_clusters_section(clusters_data: List[Dict]) -> str:
             '''
         
         if cluster.get('suggested_url'):
-            html += f'<span class="badge badge-url">→ {cluster["suggested_url"]}</span>'
+            yield f'<span class="badge badge-url">→ {escape(str(cluster["suggested_url"]))}</span>'
         
-        html += '</div>'
+        yield '</div>'
         
         if cluster.get('top_queries'):
-            html += f'''
+            yield f'''
                 <button class="toggle-btn" onclick="toggleQueries({cluster['id']})">Показать запросы</button>
                 <div id="queries-{cluster['id']}" class="queries-list queries-hidden">
                 '''
             
             for query in cluster['top_queries']:
-                keyword = query.get('keyword', '')
+                keyword = escape(str(query.get('keyword', '')))
                 freq = query.get('frequency_world', 0)
-                html += f'''
+                yield f'''
                     <div class="query-item">
                         <span class="query-text">{keyword}</span>
                         <span class="query-freq">{freq:,}</span>
                     </div>
                     '''
             
-            html += '</div>'
+            yield '</div>'
         
-        html += '</div>'
+        yield '</div>'
     
-    html += '</div>'
-    return html
+    yield '</div>'
 
+
+def generate_clusters_section(clusters_data: List[Dict]) -> str:
+    """
+    Генерирует секцию кластеров
+    
+    Args:
+        clusters_data: Список словарей с данными кластеров
+        
+    Returns:
+        HTML код секции кластеров
+    """
+    return ''.join(iter_clusters_section(clusters_data))
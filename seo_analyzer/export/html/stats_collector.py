@@ -1,9 +1,14 @@
 """Сбор статистики и данных для дашборда"""
 
 from typing import Dict, List
+import numpy as np
 import pandas as pd
 
 
+# Сколько самых частотных запросов кластера выводится в дашборде
+TOP_QUERIES_COUNT = 30
+
+
 def collect_stats(df: pd.DataFrame) -> Dict:
     """
     Собирает общую статистику из DataFrame
@@ -16,10 +21,16 @@ def collect_stats(df: pd.DataFrame) -> Dict:
     """
     stats = {
         'total_queries': len(df),
-        'total_frequency': int(df['frequency_world'].sum()) if 'frequency_world' in df.columns else 0,
-        'avg_frequency': round(df['frequency_world'].mean(), 1) if 'frequency_world' in df.columns else 0,
+        'total_frequency': 0,
+        'avg_frequency': 0,
     }
     
+    # Частотность: сумма и среднее по одной колонке
+    if 'frequency_world' in df.columns:
+        frequency = df['frequency_world']
+        stats['total_frequency'] = int(frequency.sum())
+        stats['avg_frequency'] = round(frequency.mean(), 1)
+    
     # Кластеры
     if 'semantic_cluster_id' in df.columns:
         stats['n_clusters'] = int(df['semantic_cluster_id'].nunique())
@@ -32,19 +43,80 @@ def collect_stats(df: pd.DataFrame) -> Dict:
     if 'funnel_stage' in df.columns:
         stats['funnel_dist'] = df['funnel_stage'].value_counts().to_dict()
     
-    # Бренды
+    # Бренды (сумма считается один раз - и для количества, и для процента)
     if 'is_brand_query' in df.columns:
-        stats['branded_count'] = int(df['is_brand_query'].sum())
-        stats['brand_percent'] = round((df['is_brand_query'].sum() / len(df)) * 100, 1)
+        branded_sum = df['is_brand_query'].sum()
+        stats['branded_count'] = int(branded_sum)
+        stats['brand_percent'] = round((branded_sum / len(df)) * 100, 1)
     
     # География
     if 'has_geo' in df.columns:
-        stats['geo_count'] = int(df['has_geo'].sum())
-        stats['geo_percent'] = round((df['has_geo'].sum() / len(df)) * 100, 1)
+        geo_sum = df['has_geo'].sum()
+        stats['geo_count'] = int(geo_sum)
+        stats['geo_percent'] = round((geo_sum / len(df)) * 100, 1)
     
     return stats
 
 
+def _cluster_modes(values: pd.Series, codes: np.ndarray, clusters_count: int) -> List:
+    """
+    Самое частое значение колонки для каждого кластера (за один np.bincount)
+    
+    Args:
+        values: Колонка DataFrame (малой мощности - интент, этап воронки)
+        codes: Коды кластеров строк (0..clusters_count-1)
+        clusters_count: Количество кластеров
+        
+    Returns:
+        Список мод по кодам кластеров; при равенстве - наименьшее значение
+        (как у Series.mode), 'unknown' если значений нет
+    """
+    # Коды значений по возрастанию значений; пропуски (-1) не учитываются
+    value_codes, uniques = pd.factorize(values, sort=True)
+    has_value = value_codes >= 0
+    values_count = len(uniques)
+    if values_count == 0:
+        return ['unknown'] * clusters_count
+    
+    # Таблица "кластер x значение": argmax берет первый максимум - наименьшее значение
+    counts = np.bincount(
+        codes[has_value] * values_count + value_codes[has_value],
+        minlength=clusters_count * values_count
+    ).reshape(clusters_count, values_count)
+    
+    unique_values = list(uniques)
+    has_counts = counts.any(axis=1).tolist()
+    return [
+        unique_values[value_code] if has_count else 'unknown'
+        for value_code, has_count in zip(counts.argmax(axis=1).tolist(), has_counts)
+    ]
+
+
+def _cluster_top_queries(df: pd.DataFrame, codes: np.ndarray, clusters_count: int) -> List[List[Dict]]:
+    """
+    Топ запросов по частотности для каждого кластера (одна сортировка на все кластеры)
+    
+    Args:
+        df: DataFrame с колонками keyword и frequency_world
+        codes: Коды кластеров строк (0..clusters_count-1)
+        clusters_count: Количество кластеров
+        
+    Returns:
+        Списки записей {keyword, frequency_world} по кодам кластеров - как
+        nlargest(TOP_QUERIES_COUNT, 'frequency_world') (при равенстве - по порядку строк)
+    """
+    # Пропуски частотности - в конце кластера, как у DataFrame.nlargest
+    ranked = df[['keyword', 'frequency_world']].assign(_code=codes)
+    ranked = ranked.sort_values('frequency_world', ascending=False, kind='stable', na_position='last')
+    top = ranked.groupby('_code', sort=False).head(TOP_QUERIES_COUNT)
+    
+    # Записи собираются из списков колонок напрямую - без to_dict('records')
+    top_queries = [[] for _ in range(clusters_count)]
+    for code, keyword, frequency in zip(top['_code'].tolist(), top['keyword'].tolist(), top['frequency_world'].tolist()):
+        top_queries[code].append({'keyword': keyword, 'frequency_world': frequency})
+    return top_queries
+
+
 def collect_clusters_data(df: pd.DataFrame) -> List[Dict]:
     """
     Собирает детальные данные по кластерам
@@ -58,37 +130,55 @@ def collect_clusters_data(df: pd.DataFrame) -> List[Dict]:
     if 'semantic_cluster_id' not in df.columns:
         return []
     
+    df = df[df['semantic_cluster_id'].notna()]
+    if df.empty:
+        return []
+    
+    # Коды кластеров по порядку первого появления (как у unique()); все агрегаты
+    # считаются по кодам за один проход на колонку, без цикла по кластерам
+    codes, cluster_ids = pd.factorize(df['semantic_cluster_id'])
+    clusters_count = len(cluster_ids)
+    first_rows = df.iloc[np.unique(codes, return_index=True)[1]]
+    sizes = np.bincount(codes, minlength=clusters_count).tolist()
+    
+    has_frequency = 'frequency_world' in df.columns
+    if has_frequency:
+        frequency = df['frequency_world'].groupby(codes)
+        total_freqs = frequency.sum().tolist()
+        # Кластер без частотностей - np.nan, как у Series.mean()
+        avg_freqs = [value if value == value else np.nan for value in frequency.mean().to_numpy()]
+        top_queries = _cluster_top_queries(df, codes, clusters_count)
+    
+    names = first_rows['cluster_name'].tolist() if 'cluster_name' in df.columns else None
+    main_intents = _cluster_modes(df['main_intent'], codes, clusters_count) if 'main_intent' in df.columns else None
+    funnel_stages = _cluster_modes(df['funnel_stage'], codes, clusters_count) if 'funnel_stage' in df.columns else None
+    suggested_urls = first_rows['suggested_url'].tolist() if 'suggested_url' in df.columns else None
+    
     clusters = []
     
-    for cluster_id in df['semantic_cluster_id'].unique():
-        if pd.isna(cluster_id):
-            continue
-        
-        cluster_df = df[df['semantic_cluster_id'] == cluster_id]
-        
+    for code, cluster_id in enumerate(cluster_ids.tolist()):
         cluster_info = {
             'id': int(cluster_id),
-            'name': cluster_df['cluster_name'].iloc[0] if 'cluster_name' in cluster_df.columns else f'Кластер {int(cluster_id)}',
-            'size': len(cluster_df),
-            'total_freq': int(cluster_df['frequency_world'].sum()) if 'frequency_world' in cluster_df.columns else 0,
-            'avg_freq': round(cluster_df['frequency_world'].mean(), 1) if 'frequency_world' in cluster_df.columns else 0,
+            'name': names[code] if names is not None else f'Кластер {int(cluster_id)}',
+            'size': sizes[code],
+            'total_freq': int(total_freqs[code]) if has_frequency else 0,
+            'avg_freq': round(avg_freqs[code], 1) if has_frequency else 0,
         }
         
         # Основной интент
-        if 'main_intent' in cluster_df.columns:
-            cluster_info['main_intent'] = cluster_df['main_intent'].mode().iloc[0] if len(cluster_df['main_intent'].mode()) > 0 else 'unknown'
+        if main_intents is not None:
+            cluster_info['main_intent'] = main_intents[code]
         
         # Воронка
-        if 'funnel_stage' in cluster_df.columns:
-            cluster_info['funnel_stage'] = cluster_df['funnel_stage'].mode().iloc[0] if len(cluster_df['funnel_stage'].mode()) > 0 else 'unknown'
+        if funnel_stages is not None:
+            cluster_info['funnel_stage'] = funnel_stages[code]
         
         # Целевая страница
-        if 'suggested_url' in cluster_df.columns:
-            cluster_info['suggested_url'] = cluster_df['suggested_url'].iloc[0] if not pd.isna(cluster_df['suggested_url'].iloc[0]) else ''
+        if suggested_urls is not None:
+            cluster_info['suggested_url'] = suggested_urls[code] if not pd.isna(suggested_urls[code]) else ''
         
         # Топ-30 запросов
-        top_queries = cluster_df.nlargest(30, 'frequency_world')[['keyword', 'frequency_world']].to_dict('records') if 'frequency_world' in cluster_df.columns else []
-        cluster_info['top_queries'] = top_queries
+        cluster_info['top_queries'] = top_queries[code] if has_frequency else []
         
         clusters.append(cluster_info)
     
@@ -96,4 +186,3 @@ def collect_clusters_data(df: pd.DataFrame) -> List[Dict]:
     clusters.sort(key=lambda x: x['total_freq'], reverse=True)
     
     return clusters
-
@@ -1,14 +1,8 @@
 """CSS стили для HTML дашборда"""
 
 
-def get_css_styles() -> str:
-    """
-    Возвращает CSS стили для дашборда
-    
-    Returns:
-        Строка с CSS кодом
-    """
-    return """
+# CSS стили дашборда
+CSS_STYLES = """
         * {
             margin: 0;
             padding: 0;
@@ -306,3 +300,13 @@ def get_css_styles() -> str:
         }
     """
 
+
+def get_css_styles() -> str:
+    """
+    Возвращает CSS стили для дашборда
+    
+    Returns:
+        Строка с CSS кодом
+    """
+    return CSS_STYLES
+
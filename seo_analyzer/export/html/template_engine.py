@@ -3,14 +3,8 @@
 from typing import Dict
 
 
-def get_javascript() -> str:
-    """
-    Возвращает JavaScript код для интерактивности
-    
-    Returns:
-        Строка с JavaScript кодом
-    """
-    return """
+# JavaScript код для интерактивности дашборда
+JAVASCRIPT = """
     <script>
         // Поиск по кластерам
         function searchClusters() {
@@ -61,27 +55,33 @@ def get_javascript() -> str:
     """
 
 
-def generate_html_template(
+def get_javascript() -> str:
+    """
+    Возвращает JavaScript код для интерактивности
+    
+    Returns:
+        Строка с JavaScript кодом
+    """
+    return JAVASCRIPT
+
+
+def generate_html_head(
     stats: Dict,
     intent_section: str,
     funnel_section: str,
-    clusters_section: str,
-    css_styles: str,
-    javascript: str
+    css_styles: str
 ) -> str:
     """
-    Генерирует основной HTML шаблон дашборда
+    Генерирует начало HTML дашборда - до секции кластеров
     
     Args:
         stats: Статистика анализа
         intent_section: HTML секции интентов
         funnel_section: HTML секции воронки
-        clusters_section: HTML секции кластеров
         css_styles: CSS стили
-        javascript: JavaScript код
         
     Returns:
-        Полный HTML код дашборда
+        HTML код от начала документа до секции кластеров
     """
     return f"""
 <!DOCTYPE html>
@@ -129,7 +129,20 @@ def generate_html_template(
         
         {funnel_section}
         
-        {clusters_section}
+        """
+
+
+def generate_html_tail(javascript: str) -> str:
+    """
+    Генерирует конец HTML дашборда - после секции кластеров
+    
+    Args:
+        javascript: JavaScript код
+        
+    Returns:
+        HTML код от секции кластеров до конца документа
+    """
+    return f"""
     </div>
     
     {javascript}
@@ -137,3 +150,31 @@ def generate_html_template(
 </html>
 """
 
+
+def generate_html_template(
+    stats: Dict,
+    intent_section: str,
+    funnel_section: str,
+    clusters_section: str,
+    css_styles: str,
+    javascript: str
+) -> str:
+    """
+    Генерирует основной HTML шаблон дашборда
+    
+    Args:
+        stats: Статистика анализа
+        intent_section: HTML секции интентов
+        funnel_section: HTML секции воронки
+        clusters_section: HTML секции кластеров
+        css_styles: CSS стили
+        javascript: JavaScript код
+        
+    Returns:
+        Полный HTML код дашборда
+    """
+    return (
+        generate_html_head(stats, intent_section, funnel_section, css_styles)
+        + clusters_section
+        + generate_html_tail(javascript)
+    )
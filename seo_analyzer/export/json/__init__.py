@@ -8,6 +8,7 @@ JSON экспорт - модули для создания JSON структур
 - price_info_builder: Построение информации о ценах
 - direct_info_builder: Построение информации о Yandex Direct
 - url_clustering_builder: Построение информации о URL кластеризации
+- numeric_utils: Приведение колонок к числовому типу
 """
 
 from .cluster_builder import ClusterInfoBuilder
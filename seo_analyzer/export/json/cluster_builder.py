@@ -7,6 +7,7 @@ from .keyword_builder import KeywordInfoBuilder
 from .price_info_builder import PriceInfoBuilder
 from .direct_info_builder import DirectInfoBuilder
 from .url_clustering_builder import URLClusteringBuilder
+from .numeric_utils import to_numeric_column
 
 
 class ClusterInfoBuilder:
@@ -75,11 +76,8 @@ class ClusterInfoBuilder:
         # 12. Связанные кластеры (для перелинковки)
         self._add_related_clusters(cluster_info, cluster_id)
         
-        # 13. Запросы (в самом конце)
-        cluster_info['keywords'] = []
-        for _, row in cluster_df.iterrows():
-            keyword_info = self.keyword_builder.build(row)
-            cluster_info['keywords'].append(keyword_info)
+        # 13. Запросы (в самом конце): строятся по колонкам, без объекта на каждую строку
+        cluster_info['keywords'] = self.keyword_builder.build_batch(cluster_df)
         
         return cluster_info
     
@@ -98,12 +96,12 @@ class ClusterInfoBuilder:
     def _add_frequency(self, cluster_info: Dict, cluster_df: pd.DataFrame):
         """Добавляет частотность"""
         if 'frequency_world' in cluster_df.columns:
-            freq_world = pd.to_numeric(cluster_df['frequency_world'], errors='coerce')
+            freq_world = to_numeric_column(cluster_df['frequency_world'])
             cluster_info['total_frequency'] = int(freq_world.sum())
             cluster_info['avg_frequency'] = int(freq_world.mean())
         
         if 'frequency_exact' in cluster_df.columns:
-            freq_exact = pd.to_numeric(cluster_df['frequency_exact'], errors='coerce')
+            freq_exact = to_numeric_column(cluster_df['frequency_exact'])
             cluster_info['total_frequency_exact'] = int(freq_exact.sum())
             cluster_info['avg_frequency_exact'] = int(freq_exact.mean())
     
@@ -2,6 +2,7 @@
 
 from typing import Dict
 import pandas as pd
+from .numeric_utils import to_numeric_column
 
 
 class DirectInfoBuilder:
@@ -28,26 +29,26 @@ class DirectInfoBuilder:
         direct_info = {}
         
         # Агрегированные показы и клики (сумма)
-        direct_info['total_shows'] = int(pd.to_numeric(direct_df['direct_shows'], errors='coerce').sum())
-        direct_info['total_clicks'] = int(pd.to_numeric(direct_df['direct_clicks'], errors='coerce').sum())
+        direct_info['total_shows'] = int(to_numeric_column(direct_df['direct_shows']).sum())
+        direct_info['total_clicks'] = int(to_numeric_column(direct_df['direct_clicks']).sum())
         
         # Средние метрики
-        direct_info['avg_ctr'] = round(pd.to_numeric(direct_df['direct_ctr'], errors='coerce').mean(), 2)
-        direct_info['avg_cpc'] = round(pd.to_numeric(direct_df['direct_avg_cpc'], errors='coerce').mean(), 2)
+        direct_info['avg_ctr'] = round(to_numeric_column(direct_df['direct_ctr']).mean(), 2)
+        direct_info['avg_cpc'] = round(to_numeric_column(direct_df['direct_avg_cpc']).mean(), 2)
         
         # Диапазон CPC
         if 'direct_min_cpc' in df.columns:
-            direct_info['min_cpc'] = round(pd.to_numeric(direct_df['direct_min_cpc'], errors='coerce').min(), 2)
+            direct_info['min_cpc'] = round(to_numeric_column(direct_df['direct_min_cpc']).min(), 2)
         if 'direct_max_cpc' in df.columns:
-            direct_info['max_cpc'] = round(pd.to_numeric(direct_df['direct_max_cpc'], errors='coerce').max(), 2)
+            direct_info['max_cpc'] = round(to_numeric_column(direct_df['direct_max_cpc']).max(), 2)
         
         # Средняя конкуренция
         if 'direct_competition' in df.columns:
-            direct_info['avg_competition'] = round(pd.to_numeric(direct_df['direct_competition'], errors='coerce').mean(), 2)
+            direct_info['avg_competition'] = round(to_numeric_column(direct_df['direct_competition']).mean(), 2)
         
         # Бюджет на месяц (сумма по всем запросам кластера)
         if 'direct_monthly_budget' in df.columns:
-            monthly_budgets = pd.to_numeric(direct_df['direct_monthly_budget'], errors='coerce').dropna()
+            monthly_budgets = to_numeric_column(direct_df['direct_monthly_budget']).dropna()
             if len(monthly_budgets) > 0:
                 direct_info['total_monthly_budget'] = round(monthly_budgets.sum(), 2)
         
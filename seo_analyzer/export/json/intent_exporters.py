@@ -5,6 +5,7 @@ import json
 from pathlib import Path
 from typing import Dict, List, Callable
 import pandas as pd
+from .numeric_utils import to_numeric_column
 
 
 def export_commercial_clusters(
@@ -55,9 +56,11 @@ def export_commercial_clusters(
             'commercial'
         )
         
-        # Группируем по кластерам
+        # Группируем по кластерам: строки кластеров находятся одним groupby,
+        # без сравнения всей колонки с каждым ID
+        cluster_rows = commercial_df.groupby(cluster_column).indices
         for cluster_id in commercial_cluster_ids:
-            cluster_df = commercial_df[commercial_df[cluster_column] == cluster_id]
+            cluster_df = commercial_df.iloc[cluster_rows[cluster_id]]
             cluster_info = build_cluster_info_fn(cluster_id, cluster_df)
             hierarchy['subclusters'].append(cluster_info)
         
@@ -121,9 +124,11 @@ def export_informational_clusters(
             'informational'
         )
         
-        # Группируем по кластерам
+        # Группируем по кластерам: строки кластеров находятся одним groupby,
+        # без сравнения всей колонки с каждым ID
+        cluster_rows = informational_df.groupby(cluster_column).indices
         for cluster_id in informational_cluster_ids:
-            cluster_df = informational_df[informational_df[cluster_column] == cluster_id]
+            cluster_df = informational_df.iloc[cluster_rows[cluster_id]]
             cluster_info = build_cluster_info_fn(cluster_id, cluster_df)
             hierarchy['subclusters'].append(cluster_info)
         
@@ -155,13 +160,10 @@ def _filter_pure_intent_clusters(
     Returns:
         Список ID кластеров
     """
-    cluster_ids = []
-    for cluster_id, cluster_df in df.groupby(cluster_column):
-        # Все запросы кластера должны иметь одинаковый интент
-        intents = cluster_df['main_intent'].unique()
-        if len(intents) == 1 and intents[0] == intent:
-            cluster_ids.append(cluster_id)
-    return cluster_ids
+    # Все запросы кластера должны иметь этот интент (пропуск интента - не совпадение).
+    # Один groupby по булевой колонке вместо unique() для каждого кластера
+    is_pure = (df['main_intent'] == intent).groupby(df[cluster_column]).all()
+    return is_pure.index[is_pure.to_numpy()].tolist()
 
 
 def _build_hierarchy_structure(
@@ -176,7 +178,7 @@ def _build_hierarchy_structure(
         'intent_filter': intent_filter,
         'total_queries': len(df),
         'total_clusters': len(cluster_ids),
-        'total_frequency': int(pd.to_numeric(df['frequency_world'], errors='coerce').sum()) if 'frequency_world' in df.columns else 0,
+        'total_frequency': int(to_numeric_column(df['frequency_world']).sum()) if 'frequency_world' in df.columns else 0,
         'subclusters': []
     }
 
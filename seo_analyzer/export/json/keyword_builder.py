@@ -1,10 +1,14 @@
 """Построитель информации о запросе для JSON"""
 
-from typing import Dict
+from typing import Dict, List, Mapping
 import pandas as pd
 import numpy as np
 
 
+# Типы numpy (kind), для которых tolist() уже возвращает native Python значения
+NATIVE_DTYPE_KINDS = frozenset('iufb')
+
+
 class KeywordInfoBuilder:
     """Построитель информации о запросе"""
     
@@ -117,12 +121,12 @@ class KeywordInfoBuilder:
         'form_prepositional': 'prepositional', # Предложный (о ком? о чём?)
     }
     
-    def build(self, row: pd.Series) -> Dict:
+    def build(self, row: Mapping) -> Dict:
         """
         Строит информацию о запросе
         
         Args:
-            row: Строка DataFrame
+            row: Строка DataFrame (Series или словарь из to_dict('records'))
             
         Returns:
             Словарь с информацией о запросе
@@ -137,7 +141,56 @@ class KeywordInfoBuilder:
         
         return keyword_info
     
-    def _add_optional_fields(self, keyword_info: Dict, row: pd.Series):
+    def build_batch(self, df: pd.DataFrame) -> List[Dict]:
+        """
+        Строит информацию о запросах для всех строк DataFrame
+        
+        Результат совпадает с build для каждой строки, но обход идет по колонкам:
+        каждая колонка и ее маска пропусков извлекаются один раз, а поля,
+        которых нет в DataFrame, не проверяются для каждой строки.
+        
+        Args:
+            df: DataFrame с запросами (например, запросы одного кластера)
+            
+        Returns:
+            Список словарей с информацией о запросах (в порядке строк)
+        """
+        if 'keyword' in df.columns:
+            keywords_info = [{'keyword': keyword} for keyword in df['keyword'].tolist()]
+        else:
+            keywords_info = [{'keyword': ''} for _ in range(len(df))]
+        
+        # Опциональные поля - в порядке OPTIONAL_FIELDS, как в build
+        for field in self.OPTIONAL_FIELDS:
+            if field not in df.columns:
+                continue
+            column = df[field]
+            values = column.tolist()
+            # tolist() numpy-колонок чисел и bool уже дает int/float/bool - конвертация
+            # значений нужна только для остальных типов (object, nullable, category)
+            if not (isinstance(column.dtype, np.dtype) and column.dtype.kind in NATIVE_DTYPE_KINDS):
+                values = [self._convert_value(value) for value in values]
+            for keyword_info, value, is_missing in zip(keywords_info, values, column.isna().tolist()):
+                if not is_missing:
+                    keyword_info[field] = value
+        
+        # Падежные формы
+        rows_case_forms = [{} for _ in range(len(df))]
+        for df_field, case_name in self.CASE_MAPPING.items():
+            if df_field not in df.columns:
+                continue
+            column = df[df_field]
+            for case_forms, value, is_missing in zip(rows_case_forms, column.tolist(), column.isna().tolist()):
+                if not is_missing:
+                    case_forms[case_name] = value
+        
+        for keyword_info, case_forms in zip(keywords_info, rows_case_forms):
+            if case_forms:
+                keyword_info['case_forms'] = case_forms
+        
+        return keywords_info
+    
+    def _add_optional_fields(self, keyword_info: Dict, row: Mapping):
         """Добавляет опциональные поля"""
         for field in self.OPTIONAL_FIELDS:
             if field in row and not pd.isna(row[field]):
@@ -154,7 +207,7 @@ class KeywordInfoBuilder:
             return str(value)
         return value
     
-    def _add_case_forms(self, keyword_info: Dict, row: pd.Series):
+    def _add_case_forms(self, keyword_info: Dict, row: Mapping):
         """Добавляет падежные формы (если есть)"""
         case_forms = {}
         
@@ -0,0 +1,22 @@
+"""Приведение колонок к числовому типу для агрегатов JSON"""
+
+import pandas as pd
+
+
+def to_numeric_column(column: pd.Series) -> pd.Series:
+    """
+    Привести колонку к числам (нечисловые значения - NaN)
+    
+    Колонка, которая уже числовая, возвращается как есть: pd.to_numeric вернул
+    бы ее копию того же типа, а билдеры вызываются для каждого кластера и
+    колонки - проверка типа заметно дешевле копирования.
+    
+    Args:
+        column: Колонка DataFrame
+        
+    Returns:
+        Числовая колонка
+    """
+    if pd.api.types.is_numeric_dtype(column.dtype):
+        return column
+    return pd.to_numeric(column, errors='coerce')
@@ -2,6 +2,7 @@
 
 from typing import Dict
 import pandas as pd
+from .numeric_utils import to_numeric_column
 
 
 class PriceInfoBuilder:
@@ -33,24 +34,24 @@ class PriceInfoBuilder:
     def _add_aggregated_prices(self, cluster_info: Dict, prices_df: pd.DataFrame, df: pd.DataFrame):
         """Добавляет агрегированные ценовые данные"""
         # Средняя цена
-        avg_price = pd.to_numeric(prices_df['serp_avg_price'], errors='coerce').mean()
+        avg_price = to_numeric_column(prices_df['serp_avg_price']).mean()
         if not pd.isna(avg_price):
             cluster_info['serp_avg_price'] = round(avg_price, 2)
         
         # Медианная цена
         if 'serp_median_price' in df.columns:
-            median_prices = pd.to_numeric(prices_df['serp_median_price'], errors='coerce').dropna()
+            median_prices = to_numeric_column(prices_df['serp_median_price']).dropna()
             if len(median_prices) > 0:
                 cluster_info['serp_median_price'] = round(median_prices.mean(), 2)
         
         # Диапазон цен
         if 'serp_min_price' in df.columns:
-            min_prices = pd.to_numeric(prices_df['serp_min_price'], errors='coerce').dropna()
+            min_prices = to_numeric_column(prices_df['serp_min_price']).dropna()
             if len(min_prices) > 0:
                 cluster_info['serp_min_price'] = int(min_prices.min())
         
         if 'serp_max_price' in df.columns:
-            max_prices = pd.to_numeric(prices_df['serp_max_price'], errors='coerce').dropna()
+            max_prices = to_numeric_column(prices_df['serp_max_price']).dropna()
             if len(max_prices) > 0:
                 cluster_info['serp_max_price'] = int(max_prices.max())
         
@@ -62,19 +63,19 @@ class PriceInfoBuilder:
         
         # Среднее количество предложений
         if 'serp_offers_count' in df.columns:
-            offers_count = pd.to_numeric(prices_df['serp_offers_count'], errors='coerce').dropna()
+            offers_count = to_numeric_column(prices_df['serp_offers_count']).dropna()
             if len(offers_count) > 0:
                 cluster_info['serp_offers_count'] = round(offers_count.mean(), 1)
         
         # Среднее количество предложений со скидками
         if 'serp_offers_with_discount' in df.columns:
-            offers_with_discount = pd.to_numeric(prices_df['serp_offers_with_discount'], errors='coerce').dropna()
+            offers_with_discount = to_numeric_column(prices_df['serp_offers_with_discount']).dropna()
             if len(offers_with_discount) > 0:
                 cluster_info['serp_offers_with_discount'] = round(offers_with_discount.mean(), 1)
         
         # Средний процент скидки
         if 'serp_avg_discount_percent' in df.columns:
-            discounts = pd.to_numeric(prices_df['serp_avg_discount_percent'], errors='coerce').dropna()
+            discounts = to_numeric_column(prices_df['serp_avg_discount_percent']).dropna()
             if len(discounts) > 0:
                 cluster_info['serp_avg_discount_percent'] = round(discounts.mean(), 1)
     
@@ -90,12 +91,12 @@ class PriceInfoBuilder:
         
         # Процент предложений со скидками
         if 'serp_offers_with_discount' in df.columns and 'serp_offers_count' in df.columns:
-            offers_with_discount_num = pd.to_numeric(prices_df['serp_offers_with_discount'], errors='coerce')
-            offers_count_num = pd.to_numeric(prices_df['serp_offers_count'], errors='coerce')
+            offers_with_discount_num = to_numeric_column(prices_df['serp_offers_with_discount'])
+            offers_count_num = to_numeric_column(prices_df['serp_offers_count'])
             discount_df = prices_df[offers_count_num > 0]
             if len(discount_df) > 0:
-                discount_ratio = (pd.to_numeric(discount_df['serp_offers_with_discount'], errors='coerce') / 
-                                 pd.to_numeric(discount_df['serp_offers_count'], errors='coerce')).mean()
+                discount_ratio = (to_numeric_column(discount_df['serp_offers_with_discount']) / 
+                                 to_numeric_column(discount_df['serp_offers_count'])).mean()
                 if not pd.isna(discount_ratio):
                     price_stats['discount_ratio'] = round(discount_ratio * 100, 1)
         
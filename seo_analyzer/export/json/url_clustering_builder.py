@@ -2,9 +2,34 @@
 
 from typing import Dict, List
 from collections import Counter
+from functools import lru_cache
 import pandas as pd
 
 
+@lru_cache(maxsize=100000)
+def normalize_url(url: str) -> str:
+    """
+    Нормализует URL (без протокола, www и завершающего слэша, в нижнем регистре)
+    
+    Одни и те же URL выдачи повторяются у многих запросов кластера и у разных
+    кластеров, поэтому результат кешируется.
+    
+    Args:
+        url: URL из выдачи
+        
+    Returns:
+        Нормализованный URL
+    """
+    if not url:
+        return ""
+    url = url.replace('https://', '').replace('http://', '')
+    url = url.split(' ')[0]
+    url = url.replace('www.', '')
+    if url.endswith('/'):
+        url = url[:-1]
+    return url.lower()
+
+
 class URLClusteringBuilder:
     """Добавляет информацию о URL кластеризации"""
     
@@ -27,14 +52,17 @@ class URLClusteringBuilder:
                 return
         
         all_urls = []
-        url_sets = []
+        rows_with_urls = 0
         url_to_titles = {}  # Словарь для хранения title по URL
         url_to_snippets = {}  # Словарь для хранения snippet по URL
         
-        for _, row in df.iterrows():
+        # Значения колонки перебираются списком - без Series на каждую строку
+        serp_values = df[documents_col if has_full_documents else serp_col].tolist()
+        
+        for serp_value in serp_values:
             if has_full_documents:
                 # Извлекаем URL, title и snippet из полных данных документов
-                documents = row[documents_col]
+                documents = serp_value
                 if not documents:
                     continue
                     
@@ -57,23 +85,26 @@ class URLClusteringBuilder:
                                     url_to_snippets[norm_url] = snippet
             else:
                 # Старый способ - только URL без title
-                urls = self._extract_urls(row[serp_col])
+                urls = self._extract_urls(serp_value)
                 urls = urls[:30]
             
             if urls:
-                url_set = set(urls)
-                url_sets.append(url_set)
-                all_urls.extend(list(url_set))
+                # Каждый URL учитывается один раз на запрос (в порядке выдачи)
+                rows_with_urls += 1
+                all_urls.extend(dict.fromkeys(urls))
         
-        if not url_sets:
+        if not rows_with_urls:
             return
-            
-        # URL которые есть во всех запросах (пересечение)
-        common_urls = set.intersection(*url_sets)
+        
+        counter = Counter(all_urls)
+        
+        # URL которые есть во всех запросах (пересечение): URL встречается
+        # не больше одного раза на запрос, поэтому это URL со счетчиком = числу запросов
+        common_urls = [url for url, count in counter.items() if count == rows_with_urls]
         
         # Добавляем common_urls с title и snippet
         common_urls_list = []
-        for url in sorted(list(common_urls)):
+        for url in sorted(common_urls):
             url_info = {'url': url}
             if url in url_to_titles:
                 url_info['title'] = url_to_titles[url]
@@ -85,7 +116,6 @@ class URLClusteringBuilder:
         
         # URL на основе которых скорее всего было объединение (частые)
         if all_urls:
-            counter = Counter(all_urls)
             min_count = 2 if len(df) > 1 else 1
             
             popular = []
@@ -124,12 +154,5 @@ class URLClusteringBuilder:
     
     def _normalize_url(self, url: str) -> str:
         """Нормализует URL"""
-        if not url:
-            return ""
-        url = url.replace('https://', '').replace('http://', '')
-        url = url.split(' ')[0]
-        url = url.replace('www.', '')
-        if url.endswith('/'):
-            url = url[:-1]
-        return url.lower()
+        return normalize_url(url)
 